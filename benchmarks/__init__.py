@@ -0,0 +1,6 @@
+"""Benchmarks of Dictionary and LocalDictionary, run without the real
+API Dictionary: words come from a synthetic lexicon (see lexicon.py)
+served by a local stand-in of the API (see server.py).
+
+Usage: python -m benchmarks [--sizes 1000 10000 100000] [--output FILE]
+"""
@@ -0,0 +1,110 @@
+"""Synthetic French-like lexicon, the same seed always gives the same
+words, so that results of two versions can be compared.
+"""
+import random
+
+ONSETS = (
+    '', 'b', 'c', 'ch', 'd', 'f', 'g', 'j', 'l', 'm', 'n', 'p', 'r', 's',
+    't', 'v', 'br', 'cr', 'dr', 'fl', 'gr', 'pl', 'pr', 'tr'
+)
+VOWELS = (
+    'a', 'e', 'i', 'o', 'u', 'é', 'è', 'ê', 'ou', 'on', 'an', 'in', 'eu',
+    'ai', 'au', 'oi'
+)
+CODAS = ('', '', '', 'l', 'r', 's', 'n', 'x')
+# Forms of each lemma: (ending, flexional)
+NOUN_FORMS = (
+    ('', ['masculin', 'singulier']),
+    ('s', ['masculin', 'pluriel'])
+)
+ADJECTIVE_FORMS = (
+    ('', ['masculin', 'singulier']),
+    ('e', ['féminin', 'singulier']),
+    ('s', ['masculin', 'pluriel']),
+    ('es', ['féminin', 'pluriel'])
+)
+VERB_FORMS = (
+    ('er', ['infinitif']),
+    ('e', ['présent de l’indicatif', '1st personne', 'singulier']),
+    ('es', ['présent de l’indicatif', '2nd personne', 'singulier']),
+    ('ons', ['présent de l’indicatif', '1st personne', 'pluriel']),
+    ('ez', ['présent de l’indicatif', '2nd personne', 'pluriel']),
+    ('ent', ['présent de l’indicatif', '3rd personne', 'pluriel']),
+    ('ait', ['imparfait de l’indicatif', '3rd personne', 'singulier']),
+    ('é', ['participe passé', 'masculin', 'singulier'])
+)
+TYPES = (
+    ('nom', NOUN_FORMS, 5),
+    ('adjectif', ADJECTIVE_FORMS, 2),
+    ('verbe', VERB_FORMS, 3)
+)
+
+
+def make_stem(rand):
+    """Return a pronounceable stem of one to three syllables."""
+    return ''.join(
+        rand.choice(ONSETS) + rand.choice(VOWELS)
+        for i in range(rand.randint(1, 3))
+    ) + rand.choice(CODAS)
+
+
+def generate(count, seed=0):
+    """Return 'count' words like answers of API ('label', 'lem', 'gram',
+    'flexional' and 'semantic'), forms of a lemma follow each other.
+
+    *count -- Count of words
+    *[seed] -- Seed of random generator
+
+    """
+    rand = random.Random(seed)
+    words = list()
+    lemmas = set()
+    while len(words) < count:
+        gram, forms, weight = rand.choices(
+            TYPES,
+            weights=[type[2] for type in TYPES]
+        )[0]
+        stem = make_stem(rand)
+        lem = stem + forms[0][0]
+        if (lem, gram) in lemmas:
+            continue
+        lemmas.add((lem, gram))
+
+        semantic = [rand.choice(('langage courant', 'langage spécialisé'))]
+        for ending, flexional in forms:
+            if len(words) >= count:
+                break
+            words.append({
+                'label': stem + ending,
+                'lem': lem,
+                'gram': gram,
+                'flexional': [list(flexional)],
+                'semantic': list(semantic)
+            })
+
+    return words
+
+
+def frequency_list(words, count=None, seed=0):
+    """Return labels of 'words' ranked as a frequency list of a corpus,
+    first labels are the most frequent (Zipf law).
+
+    *words -- Words of generate()
+    *[count] -- Count of labels, all labels if None
+    *[seed] -- Seed of random generator
+
+    """
+    labels = list(dict.fromkeys(word['label'] for word in words))
+    random.Random(seed).shuffle(labels)
+
+    return labels[:count] if count is not None else labels
+
+
+def zipf_sample(labels, count, seed=0):
+    """Return 'count' labels drawn from a frequency list with
+    probabilities following a Zipf law (frequent labels come back).
+    """
+    rand = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(labels) + 1)]
+
+    return rand.choices(labels, weights=weights, k=count)
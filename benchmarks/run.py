@@ -0,0 +1,240 @@
+"""Run the benchmarks and write their results as JSON.
+
+For each size of lexicon, LocalDictionary is measured on insert, find,
+update, opening and eviction of words, then Dictionary is measured on
+find (from API then from local database), find_many and compose with
+the API stand-in (see server.py).
+
+Each measure gives its count of operations, seconds, operations by
+second and latencies (mean, p50, p95, p99, max).
+"""
+from contextlib import contextmanager
+from datetime import datetime
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from dictionary import Dictionary, LocalDictionary, transport
+from dictionary.metrics import Histogram
+import settings
+from . import lexicon
+from .server import StandIn
+
+
+def measure(function, items, ops=1):
+    """Call 'function' on each item and return its measure.
+
+    *function -- Function of one argument
+    *items -- Arguments of calls
+    *[ops] -- Count of operations done by each call
+
+    """
+    histogram = Histogram()
+    start_time = time.perf_counter()
+    for item in items:
+        call_time = time.perf_counter()
+        function(item)
+        histogram.record(time.perf_counter() - call_time)
+    seconds = time.perf_counter() - start_time
+
+    return {
+        'count': histogram.count * ops,
+        'seconds': seconds,
+        'ops/s': histogram.count * ops / seconds if seconds else None,
+        'latency': histogram.get_summary()
+    }
+
+
+@contextmanager
+def override(**values):
+    """Change settings in a block, they are restored at its end."""
+    saved = {name: getattr(settings, name) for name in values}
+    for name, value in values.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+
+def batches(items, size):
+    """Return 'items' cut in lists of 'size' items."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def bench_import(repeat=5):
+    """Return the seconds to import the package, without the start
+    of the interpreter.
+    """
+    def run(code):
+        start_time = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=settings.PROJECT_PATH,
+            check=True
+        )
+        return time.perf_counter() - start_time
+
+    return min(
+        run('import dictionary') - run('pass') for i in range(repeat)
+    )
+
+
+def bench_local(words, args):
+    """Measure LocalDictionary with 'words' and return results."""
+    results = dict()
+    labels = lexicon.frequency_list(words, seed=args.seed)
+    lookups = lexicon.zipf_sample(labels, args.lookups, seed=args.seed)
+    name = 'bench-local-{}'.format(len(words))
+
+    def create(word):
+        new_word = dict(LocalDictionary.DEFAULT_MODEL)
+        new_word.update(word)
+        new_word['type'] = new_word.pop('gram', None)
+        return new_word
+
+    db = LocalDictionary(name, engine=args.engine)
+    results['insert'] = measure(
+        lambda batch: db.insert_many([create(word) for word in batch]),
+        batches(words, args.batch_size),
+        ops=args.batch_size
+    )
+    results['insert']['count'] = len(words)
+
+    model = dict(LocalDictionary.DEFAULT_MODEL)
+    results['find'] = measure(
+        lambda label: db.find(dict(model, label=label)),
+        lookups
+    )
+
+    found = [db.find(dict(model, label=label))[0] for label in lookups]
+    results['update'] = measure(
+        lambda word: db.update({'isFetched': True}, word),
+        found[:args.updates]
+    )
+    db.close()
+
+    results['open'] = measure(
+        lambda i: len(LocalDictionary(name, engine=args.engine)),
+        range(3)
+    )
+
+    # Half of the database is removed
+    db = LocalDictionary(name, engine=args.engine)
+    len(db)
+    with override(LOCAL_DICT_MIN_COUNT=0,
+                  LOCAL_DICT_MAX_SIZE=db._db.get_size() // 2):
+        results['eviction'] = measure(
+            lambda i: db._clean_oldest(),
+            range(1)
+        )
+    results['eviction']['words'] = len(words) - len(db)
+    db.close()
+
+    return results
+
+
+def bench_dictionary(words, args):
+    """Measure Dictionary with 'words' served by the API stand-in
+    and return results.
+    """
+    results = dict()
+    labels = lexicon.frequency_list(words, seed=args.seed)
+    # Labels of find and find_many are not known by local database
+    found = labels[:args.lookups]
+    found_many = labels[args.lookups:2 * args.lookups]
+    lems = list(dict.fromkeys(word['lem'] for word in words))
+    name = 'bench-dictionary-{}'.format(len(words))
+
+    with StandIn(words, latency=args.latency) as server, \
+            override(DICTIONARY_API_URL=server.get_url()):
+        transport.close_session()
+        transport.reset_breakers()
+
+        dictionary = Dictionary(path=name, engine=args.engine)
+        dictionary.get_server_state()
+        results['find (API)'] = measure(dictionary.find, found)
+        results['find (local)'] = measure(dictionary.find, found)
+        results['find_many (API)'] = measure(
+            lambda labels: list(dictionary.find_many(labels)),
+            [found_many],
+            ops=len(found_many)
+        )
+        results['compose'] = measure(
+            dictionary.compose,
+            lems[:args.lookups]
+        )
+        results['stats'] = dictionary.stats()
+        results['requests'] = dict(server.requests)
+        dictionary._local_db.close()
+
+    return results
+
+
+def main(args=None):
+    """Run benchmarks from the command line."""
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmark Dictionary with a synthetic lexicon.'
+    )
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 100000],
+                        help='counts of words of lexicons')
+    parser.add_argument('--lookups', type=int, default=1000,
+                        help='count of searched labels')
+    parser.add_argument('--updates', type=int, default=200,
+                        help='count of updated words')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='seconds added to each answer of API')
+    parser.add_argument('--engine', default=None,
+                        help="storage engine, 'json' or 'sqlite'")
+    parser.add_argument('--max-size', type=int, default=1024 ** 3,
+                        help='LOCAL_DICT_MAX_SIZE in bytes')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None,
+                        help='JSON file of results (default: stdout)')
+    args = parser.parse_args(args)
+
+    report = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'commit': subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.PROJECT_PATH,
+            capture_output=True,
+            text=True
+        ).stdout.strip() or None,
+        'arguments': vars(args),
+        'import': bench_import(),
+        'results': dict()
+    }
+
+    # Databases are created in a temporary directory
+    database_path = tempfile.mkdtemp(prefix='dictionary-bench-')
+    try:
+        with override(DATABASE_PATH=database_path,
+                      LOCAL_DICT_MAX_SIZE=args.max_size):
+            for size in args.sizes:
+                print('{} words...'.format(size), file=sys.stderr)
+                words = lexicon.generate(size, seed=args.seed)
+                report['results'][str(size)] = {
+                    'LocalDictionary': bench_local(words, args),
+                    'Dictionary': bench_dictionary(words, args)
+                }
+    finally:
+        shutil.rmtree(database_path, ignore_errors=True)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output is None:
+        print(output)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
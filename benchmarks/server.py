@@ -0,0 +1,123 @@
+"""Local stand-in of the API Dictionary, built on http.server.
+
+Endpoints answer like the API, from words of a synthetic lexicon:
+*/ping -- Time of server
+*/unitex/<label>?gram= -- Words of a label
+*/unitex/compose?lem=&flexional=&semantic= -- Forms of a lemma
+*/dictionary/<lem>?type= -- Definitions of a lemma
+
+Each answer is delayed by 'latency' seconds to simulate the network.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+import json
+import threading
+import time
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answer requests from the words of the server."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = [unquote(part) for part in url.path.strip('/').split('/')]
+        query = parse_qs(url.query)
+        server = self.server
+
+        if server.latency:
+            time.sleep(server.latency)
+        server.count(path[0])
+
+        if path == ['ping']:
+            body = time.time()
+        elif path == ['unitex', 'compose']:
+            body = server.compose(
+                query.get('lem', [''])[0],
+                query.get('flexional', []),
+                query.get('semantic', [])
+            )
+        elif len(path) == 2 and path[0] == 'unitex':
+            body = server.find(path[1], query.get('gram', [None])[0])
+        elif len(path) == 2 and path[0] == 'dictionary':
+            body = server.get_infos(path[1])
+        else:
+            self.send_error(404)
+            return
+
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandIn(ThreadingHTTPServer):
+    """API Dictionary serving 'words' (see lexicon.generate) on a free
+    port of localhost, use it as a context manager.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, words, latency=0.0):
+        """Create the server.
+
+        *words -- Words of API
+        *[latency] -- Seconds before each answer
+
+        """
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.latency = latency
+        self.requests = dict()  # endpoint -> count of requests
+        self._lock = threading.Lock()
+        self._labels = dict()  # label -> [word]
+        self._lems = dict()  # lem -> [word]
+        for word in words:
+            self._labels.setdefault(word['label'], []).append(word)
+            self._lems.setdefault(word['lem'], []).append(word)
+
+    def __enter__(self):
+        threading.Thread(
+            name='api-stand-in',
+            target=self.serve_forever,
+            daemon=True
+        ).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+    def get_url(self):
+        """Return URL to set in DICTIONARY_API_URL."""
+        return 'http://{}:{}'.format(*self.server_address)
+
+    def count(self, endpoint):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def find(self, label, gram=None):
+        return [
+            word for word in self._labels.get(label, [])
+            if gram is None or word['gram'] == gram
+        ]
+
+    def compose(self, lem, flexional, semantic):
+        return [
+            word for word in self._lems.get(lem, [])
+            if all(code in word['flexional'][0] for code in flexional) and
+            all(code in word['semantic'] for code in semantic)
+        ]
+
+    def get_infos(self, lem):
+        if lem not in self._lems:
+            return []
+        return [{
+            'sens': ['Définition de {}.'.format(lem)],
+            'homonyms': []
+        }]
@@ -2,3 +2,5 @@ from .dictionary import Dictionary
 from .local_dictionary import LocalDictionary
 from .storage import Table
 from . import tags
+from . import codec
+from . import transport
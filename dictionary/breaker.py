@@ -0,0 +1,168 @@
+"""Circuit breaker of an API endpoint, so that a failing or slow server
+is not requested again and again.
+
+*closed -- Requests are sent, the circuit opens when the error rate of
+           the last requests is too high
+*open -- Requests fail fast during a delay
+*half-open -- After the delay one trial request is sent, the circuit is
+              closed if it succeeds, else it opens again for a longer
+              delay (doubled up to a max)
+
+Latencies of the last requests, answered or timed out, give the read
+timeout of the next ones (see get_timeout).
+"""
+from collections import deque
+import math
+import threading
+import time
+
+import settings
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+def get_percentile(latencies, percentile):
+    """Return the latency at 'percentile' (0 to 100) of 'latencies',
+    None if it is empty.
+    """
+    if not latencies:
+        return None
+    latencies = sorted(latencies)
+    rank = math.ceil(percentile / 100 * len(latencies)) - 1
+    return latencies[min(max(rank, 0), len(latencies) - 1)]
+
+
+class CircuitBreaker():
+    """State of the requests of one endpoint, shared by threads."""
+
+    def __init__(self, window=None, error_rate=None, min_calls=None,
+                 delay=None, max_delay=None):
+        """Create a closed circuit, arguments are by default those of
+        settings (DICTIONARY_API_BREAKER_*).
+
+        *[window] -- Count of last requests kept
+        *[error_rate] -- Rate of failed requests opening the circuit
+        *[min_calls] -- Count of requests needed to compute error rate
+        *[delay] -- Seconds the circuit stays open before a trial
+        *[max_delay] -- Max of delay after failed trials
+
+        """
+        self._error_rate = error_rate or \
+            settings.DICTIONARY_API_BREAKER_ERROR_RATE
+        self._min_calls = min_calls or \
+            settings.DICTIONARY_API_BREAKER_MIN_CALLS
+        self._base_delay = delay or settings.DICTIONARY_API_BREAKER_DELAY
+        self._max_delay = max_delay or \
+            settings.DICTIONARY_API_BREAKER_MAX_DELAY
+        # (success, latency, timed_out) of last requests
+        self._results = deque(
+            maxlen=window or settings.DICTIONARY_API_BREAKER_WINDOW
+        )
+        self._state = CLOSED
+        self._delay = self._base_delay
+        self._opened_at = None
+        self._trial = False  # A trial request is running
+        self._lock = threading.Lock()
+
+    def get_state(self):
+        """Return 'closed', 'open' or 'half-open'."""
+        with self._lock:
+            return self._get_state()
+
+    def is_ready(self):
+        """Return if a request could be sent now (see allow)."""
+        with self._lock:
+            state = self._get_state()
+            return state == CLOSED or (state == HALF_OPEN and not self._trial)
+
+    def allow(self):
+        """Return if a request can be sent now, in half-open state
+        only one trial request is allowed until its result is recorded.
+        """
+        with self._lock:
+            state = self._get_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial:
+                self._state = HALF_OPEN
+                self._trial = True
+                return True
+            return False
+
+    def record(self, success, latency, timed_out=False):
+        """Save the result of a request.
+
+        *success -- If the server answered without error
+        *latency -- Seconds of the request
+        *[timed_out] -- If the server did not answer before the timeout
+
+        """
+        with self._lock:
+            self._results.append((success, latency, timed_out))
+
+            if self._state == HALF_OPEN:
+                # Result of the trial request
+                self._trial = False
+                if success:
+                    self._state = CLOSED
+                    self._delay = self._base_delay
+                    self._results.clear()
+                    self._results.append((success, latency, timed_out))
+                else:
+                    self._open(min(self._delay * 2, self._max_delay))
+            elif self._state == CLOSED and not success and \
+                    len(self._results) >= self._min_calls:
+                errors = sum(1 for result in self._results if not result[0])
+                if errors / len(self._results) >= self._error_rate:
+                    self._open(self._base_delay)
+
+    def get_latency(self, percentile):
+        """Return the latency of successful requests at 'percentile'
+        (0 to 100), None if no request succeeded.
+        """
+        with self._lock:
+            latencies = [
+                latency for success, latency, timed_out in self._results
+                if success
+            ]
+
+        return get_percentile(latencies, percentile)
+
+    def get_timeout(self, default):
+        """Return the read timeout of next request: p99 latency of
+        answered and timed out requests times DICTIONARY_API_TIMEOUT_FACTOR,
+        up to 'default'. 'default' is returned while too few requests
+        succeeded, for a trial request and after a timeout, so that a
+        server become slower can still answer.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN or \
+                    (self._results and self._results[-1][2]):
+                return default
+            count = sum(1 for result in self._results if result[0])
+            latencies = [
+                latency for success, latency, timed_out in self._results
+                if success or timed_out
+            ]
+        if count < self._min_calls:
+            return default
+
+        timeout = get_percentile(latencies, 99) * \
+            settings.DICTIONARY_API_TIMEOUT_FACTOR
+        return min(max(timeout, settings.DICTIONARY_API_MIN_TIMEOUT), default)
+
+    def _get_state(self):
+        """Return current state, lock has to be held."""
+        if self._state == OPEN and \
+                time.monotonic() - self._opened_at >= self._delay:
+            # Delay is over, a trial can be sent
+            return HALF_OPEN
+        return self._state
+
+    def _open(self, delay):
+        """Open the circuit for 'delay' seconds, lock has to be held."""
+        self._state = OPEN
+        self._delay = delay
+        self._opened_at = time.monotonic()
@@ -0,0 +1,109 @@
+"""Two-way conversion between Unitex codes and labels (see tags.CODES),
+and parsing of DELA tag strings like 'V+z1:W:Kms'.
+"""
+from functools import lru_cache
+
+from .tags import CODES, LABELS
+
+
+# Label of each code by section
+DECODE = {section: dict(codes) for section, codes in CODES.items()}
+# Code of each label by section
+ENCODE = {
+    section: {label: code for code, label in codes.items()}
+    for section, codes in CODES.items()
+}
+# Code of each label, the first section defining a label wins
+CODES_OF = dict()
+for _codes in reversed(list(ENCODE.values())):
+    CODES_OF.update(_codes)
+
+
+def decode(code, section=None):
+    """Return label of code, None if code is unknown.
+
+    *code -- Code like 'V' or 'z1'
+    *[section] -- 'gram', 'semantic' or 'flexional', else all sections
+
+    """
+    return (DECODE[section] if section else LABELS).get(code)
+
+
+def encode(label, section=None):
+    """Return code of label, None if label is unknown.
+
+    *label -- Label like 'verbe' or 'langage courant'
+    *[section] -- 'gram', 'semantic' or 'flexional', else all sections
+
+    """
+    return (ENCODE[section] if section else CODES_OF).get(label)
+
+
+def decode_many(codes, section=None):
+    """Return labels of codes (None for unknown codes)."""
+    table = DECODE[section] if section else LABELS
+
+    return [table.get(code) for code in codes]
+
+
+def encode_many(labels, section=None):
+    """Return codes of labels (None for unknown labels)."""
+    table = ENCODE[section] if section else CODES_OF
+
+    return [table.get(label) for label in labels]
+
+
+@lru_cache(maxsize=4096)
+def parse_tag(tag):
+    """Split a DELA tag string in codes.
+
+    'V+z1:W:Kms' give ('V', ('z1',), (('W',), ('K', 'm', 's')))
+    with the grammatical code, semantic codes and flexional codes
+    of each variant.
+
+    """
+    parts = tag.split(':')
+    gram, *semantic = parts[0].split('+')
+    flexional = tuple(tuple(variant) for variant in parts[1:] if variant)
+
+    return gram, tuple(semantic), flexional
+
+
+def decode_tag(tag):
+    """Return 'type', 'semantic' and 'flexional' labels of a DELA tag,
+    codes without label are kept as they are.
+
+    *tag -- DELA tag like 'V+z1:W:Kms'
+
+    """
+    gram, semantic, flexional = parse_tag(tag)
+    gram_codes = DECODE['gram']
+    semantic_codes = DECODE['semantic']
+    flexional_codes = DECODE['flexional']
+
+    return {
+        'type': gram_codes.get(gram, gram),
+        'semantic': [semantic_codes.get(code, code) for code in semantic],
+        'flexional': [
+            [flexional_codes.get(code, code) for code in variant]
+            for variant in flexional
+        ]
+    }
+
+
+def encode_tag(type, semantic=(), flexional=()):
+    """Return the DELA tag of labels (or codes) of a word.
+
+    *type -- Grammatical type like 'verbe'
+    *[semantic] -- List of semantic
+    *[flexional] -- List of flexional variants (list of list)
+
+    """
+    gram = ENCODE['gram'].get(type, type)
+    semantic = [ENCODE['semantic'].get(label, label) for label in semantic]
+    flexional = [
+        ''.join(ENCODE['flexional'].get(label, label) for label in variant)
+        for variant in flexional
+    ]
+
+    return ':'.join(['+'.join([gram] + semantic)] + flexional)
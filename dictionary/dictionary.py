@@ -1,12 +1,15 @@
-import json
-import requests
-import asyncio
+from collections import deque
+from concurrent.futures import Future
+from contextlib import suppress
+from copy import deepcopy
+from itertools import islice
+import os
 import time
 import threading
-from contextlib import suppress
 
 import settings
 from .local_dictionary import LocalDictionary
+from . import transport
 
 
 class Dictionary():
@@ -24,64 +27,83 @@ class Dictionary():
         'download speed': None
     }
     _is_pinging = False
+    _ping_lock = threading.Lock()
+    # Thread of the first server probe (see _is_connected)
+    _probe = None
     server_infos = None
 
-    def __init__(self, path='dictionary', optimize=True):
+    def __init__(self, path='dictionary', optimize=True, engine=None,
+                 lexicon=None, frequency_list=None):
         """Create or load a new dictionary.
 
         *[path] -- Name of database
         *[optimize] -- Optimize size of local database
+        *[engine] -- Storage engine of local database ('json' or 'sqlite')
+        *[lexicon] -- Path of a compiled lexicon (see lexicon.py)
+        *[frequency_list] -- Path of a frequency list fetched in
+                             background (see warm)
 
         """
+        self._local_db = None
         if not path:
             raise TypeError('invalid path argument')
 
         self._name = path
-        self._local_db = LocalDictionary(path)
+        self._local_db = LocalDictionary(
+            path,
+            engine=engine,
+            lexicon=lexicon or settings.LOCAL_DICT_LEXICON
+        )
         self._path = self._local_db.get_table_path()
 
-        self._headers = {'Content-Type': 'application/json'}
         self._model = LocalDictionary.DEFAULT_MODEL
         self._optimize = optimize
 
-        self._async_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self._async_loop)
-        self._ping = None
-
         if Dictionary.server_infos is None:
             Dictionary.server_infos = dict(Dictionary.server_state_model)
-            self.get_server_state(timeout=1)  # Get server state
+            # Get server state in background, API is requested after it
+            Dictionary._probe = threading.Thread(
+                name='probe-server',
+                target=self._probe_server,
+                daemon=True
+            )
+            Dictionary._probe.start()
+
+        frequency_list = frequency_list or settings.LOCAL_DICT_WARM_PATH
+        self._warming = None
+        if frequency_list:
+            # Most frequent words are fetched before they are searched
+            self._warming = self.warm(frequency_list)
 
     def __del__(self):
         """Function called when instance is delete."""
         # Close the local database
-        self._local_db.close()
-
-        # If this instance launch a pinging to server
-        if self._ping is not None and self._ping[0].is_alive():
-            # Stop the thread
-            self._ping[1].set()
-
-        # Let's also cancel all running tasks:
-        pending = asyncio.all_tasks(self._async_loop)
-        for task in pending:
-            # Now we should await task to execute it's cancellation.
-            # Cancelled task raises asyncio.CancelledError
-            # that we can suppress:
-            with suppress(asyncio.CancelledError):
-                self._async_loop.run_until_complete(task)
-        self._async_loop.close()
+        if self._local_db is not None:
+            self._local_db.close()
 
     def __contains__(self, word):
-        """Return if word exist in database.
+        """Return if word exist in database (see contains)."""
+        return self.contains(word)
+
+    def contains(self, word, accent_insensitive=False):
+        """Return if word exist in database, as 'in' operator does.
 
         *word: str/dict: Label or dict with 'label' key
+        *[accent_insensitive] -- Compare labels without accents and case
 
         """
         if isinstance(word, str):
-            return len(self.find(label=word, all=True)) > 0
+            return len(self.find(
+                label=word,
+                all=True,
+                accent_insensitive=accent_insensitive
+            ) or []) > 0
         elif isinstance(word, dict):
-            return len(self.find(all=True, **word)) > 0
+            return len(self.find(
+                all=True,
+                accent_insensitive=accent_insensitive,
+                **word
+            ) or []) > 0
         else:
             return False  # word type not expected
 
@@ -104,6 +126,23 @@ class Dictionary():
 
         return self._name
 
+    def stats(self, reset=False):
+        """Return counters and latencies of this dictionary.
+
+        Returned stats is a dict with follow keys:
+        *counters -- Count of 'hits' (answered by local database),
+                     'misses' (API needed), 'remote_calls',
+                     'remote_errors' and 'evictions' (removed words)
+        *latencies -- Count, mean, p50, p95, p99 and max in seconds of
+                      'find' (local lookup), 'fetch' (API request),
+                      'write' (database write), 'flush_clocks' and
+                      'eviction'
+
+        *[reset] -- If True, restart stats from zero after the copy
+
+        """
+        return self._local_db.metrics.snapshot(reset=reset)
+
     def get_server_state(self, timeout=None):
         """Return infos about server state.
 
@@ -114,15 +153,17 @@ class Dictionary():
         *download speed -- If 'connected' dowload speed
 
         """
+        return self._run(self._get_server_state(timeout=timeout))
+
+    async def _get_server_state(self, timeout=None):
+        """Ping server and return its state (see get_server_state)."""
         # Init the return value
         ret = dict(Dictionary.server_state_model)
 
         start_time = time.time()
         # Ping server and convert its returned value
         ping_time = float(
-            self._async_loop.run_until_complete(
-                self._fetch('ping', _timeout=timeout)
-            ) or 0
+            await self._fetch('ping', _timeout=timeout) or 0
         ) or None
 
         end_time = time.time()
@@ -132,20 +173,27 @@ class Dictionary():
             ret['connected'] = True
             ret['upload speed'] = ping_time - start_time
             ret['download speed'] = end_time - ping_time
-        elif not Dictionary._is_pinging:
-            self._test_connection()
         # Save status un class for others instances know about server status
         Dictionary.server_infos = ret
 
         return ret
 
-    def find(self, label: str = None, all=False, **kwargs):
+    def find(self, label: str = None, all=False, fuzzy=False,
+             accent_insensitive=False, **kwargs):
         """Return a list of results that matching with label/type.
 
         *[label] -- Label of searching word, if None try to get in kwargs
         *[all] -- If True, find will add API Dictionary whatever result
+        *[fuzzy] -- If True and label is not known, return words of nearest
+                    known labels (see suggest) before requesting API
+        *[accent_insensitive] -- If True, compare labels without accents
+                                 and case before requesting API
         *[kwargs] -- Can be used to search with a 'word' object
 
+        API is only requested when local words are missing or too old,
+        or if 'all' remote words are asked and not already saved
+        (see _cache_results).
+
         """
         if label is None:
             if 'label' in kwargs:
@@ -159,42 +207,182 @@ class Dictionary():
             # Type is filled
             kwargs['type'] = None
 
+        query = transport.get_key('unitex', label, gram=kwargs['type'])
+        searched = self._create_word(**{
+            'label': label,
+            'type': kwargs['type']
+        })
+
         ret = list()
-        # Request of API Dictioanry
+        # Request of API Dictioanry, it runs during the local search
+        # when remote words are needed whatever local result
         fetch_future = None
-        if Dictionary.server_infos['connected']:
-            # Request the external database
-            fetch_future = asyncio.ensure_future(
-                self._fetch('unitex', label, gram=kwargs['type']),
-                loop=self._async_loop
+        if all and self._local_db.get_query(query) is None and \
+                self._is_connected():
+            self._local_db.metrics.incr('misses')
+            fetch_future = self._start_fetch(
+                'unitex',
+                label,
+                gram=kwargs['type']
             )
-        elif not Dictionary._is_pinging:
-            self._test_connection()
         # Check the local database
         result = self._local_db.find(
-                self._create_word(**{
-                    'label': label,
-                    'type': kwargs['type']
-                })
+                searched,
+                accent_insensitive=accent_insensitive
         )
 
+        if not result and fuzzy:
+            # Try nearest known labels before requesting API
+            result = self._find_suggested(label, kwargs['type'])
+
+        if fetch_future is None and self._need_fetch(query, result, all) \
+                and self._is_connected():
+            # Local words are missing or too old
+            fetch_future = self._start_fetch(
+                'unitex',
+                label,
+                gram=kwargs['type']
+            )
+
         if result:
             # Word found in local
             ret += result
         if fetch_future:
             # Get result of request
-            results = self._async_loop.run_until_complete(fetch_future) or []
-            if not result or all:
-                for result in results:
-                    # result['lem'] = result['lem'] or result['label']
-                    if 'gram' in result:
-                        result['type'] = result['gram'] or None
-                    word = self._create_word(**result)
-                    ret.append(word)  # Add result to return value
+            results = fetch_future.result()
+            if results is not None:
+                ret = self._read_through(
+                    query,
+                    searched,
+                    results,
+                    accent_insensitive=accent_insensitive
+                )
 
         return ret or None
 
-    def compose(self, lem: str, **kwargs):
+    def find_many(self, labels, type=None, concurrency=None):
+        """Generate results of find() for each label of 'labels',
+        in the same order (use zip(labels, find_many(labels))).
+
+        Known labels are read from local database, API is requested
+        for the others with at most 'concurrency' running requests,
+        results are given as soon as requests of previous labels end.
+
+        *labels -- Iterable of labels, a repeated label is searched once
+        *[type] -- Type of words that need to match to
+        *[concurrency] -- Max count of running API requests,
+                          by default DICTIONARY_API_POOL_SIZE
+
+        """
+        labels = list(labels)
+        if concurrency is None:
+            concurrency = settings.DICTIONARY_API_POOL_SIZE
+        if concurrency < 1:
+            raise TypeError('invalid concurrency argument')
+
+        results = dict()  # label -> words
+        misses = deque()  # Labels to request, in order of input
+        for label in dict.fromkeys(labels):
+            results[label] = self._local_db.find(
+                self._create_word(label=label, type=type)
+            )
+            query = transport.get_key('unitex', label, gram=type)
+            if self._need_fetch(query, results[label]):
+                misses.append(label)
+        if misses and not self._is_connected():
+            # Only local words can be given
+            misses.clear()
+
+        pending = set(misses)  # Labels of requests not yet waited
+        fetches = self._fetch_many(
+            ((miss, ('unitex', miss), {'gram': type}) for miss in misses),
+            concurrency
+        )
+        for label in labels:
+            if label in pending:
+                # Wait the request of this label, next one of misses
+                pending.discard(label)
+                miss, fetched, request = next(fetches)
+                if fetched is not None:
+                    results[label] = self._read_through(
+                        transport.get_key('unitex', label, gram=type),
+                        self._create_word(label=label, type=type),
+                        fetched
+                    )
+
+            yield results[label] or None
+
+    def warm(self, words_or_path, concurrency=None, limit=None,
+             progress=None):
+        """Fetch in background labels of a frequency list that are
+        missing or too old in local database, so that first searches
+        are answered locally, and return a concurrent.futures.Future
+        of the statistics of warming.
+
+        Requests are limited to DICTIONARY_API_WARM_RATE by second and
+        all fetched words are saved in one write at the end.
+
+        *words_or_path -- Labels, most frequent first, or path of a file
+                          with a label by line (and optionally a tab
+                          followed by its frequency)
+        *[concurrency] -- Max count of running API requests,
+                          by default DICTIONARY_API_POOL_SIZE
+        *[limit] -- Count of most frequent labels fetched,
+                    by default LOCAL_DICT_WARM_COUNT
+        *[progress] -- Function called with statistics after each request
+
+        """
+        if concurrency is None:
+            concurrency = settings.DICTIONARY_API_POOL_SIZE
+        if concurrency < 1:
+            raise TypeError('invalid concurrency argument')
+        if limit is None:
+            limit = settings.LOCAL_DICT_WARM_COUNT
+
+        if isinstance(words_or_path, (str, os.PathLike)):
+            labels = self._read_frequency_list(words_or_path, limit)
+        else:
+            labels = list(islice(words_or_path, limit))
+
+        future = Future()
+        threading.Thread(
+            name='warm-dictionary',
+            target=self._warm,
+            args=(future, labels, concurrency, progress),
+            daemon=True
+        ).start()
+
+        return future
+
+    def suggest(self, label: str, max_distance=2, limit=10):
+        """Return known labels near a misspelled 'label',
+        nearest labels first.
+
+        *label -- Misspelled label
+        *[max_distance] -- Max count of edits between labels
+        *[limit] -- Max count of labels, None for all
+
+        """
+        return [
+            suggestion for suggestion, distance in self._local_db.suggest(
+                label,
+                max_distance=max_distance,
+                limit=limit
+            )
+        ]
+
+    def complete(self, prefix: str, limit=10, type=None):
+        """Return labels of known words that start by 'prefix',
+        shortest labels first then in alphabetical order.
+
+        *prefix -- Start of searched labels
+        *[limit] -- Max count of labels, None for all
+        *[type] -- Type of word that need to match to
+
+        """
+        return self._local_db.complete(prefix, limit=limit, type=type)
+
+    def compose(self, lem: str, accent_insensitive=False, **kwargs):
         """Allow to find words according to this infinitive
         and other specifications.
 
@@ -202,6 +390,7 @@ class Dictionary():
         *[type] -- Type of word that need to match to
         *[semantic] -- List of semantic that need to match to
         *[flexional] -- List of flexional that need to match to
+        *[accent_insensitive] -- Compare local lems without accents and case
 
         """
         # Initialize additionals matching parameters
@@ -212,40 +401,57 @@ class Dictionary():
             param['semantic'] = kwargs['semantic']
         if 'flexional' in kwargs:
             param['flexional'] = kwargs['flexional']
-        # Get results
+        query = transport.get_key('unitex', 'compose', lem=lem, **param)
+        searched = self._create_word(**{
+            'lem': lem,
+            'type': kwargs.get('type'),
+            'semantic': kwargs.get('semantic') or [],
+            'flexional': kwargs.get('flexional') or []
+        })
+
+        ret = list()
+        # Get results, the request runs during the local search
         fetch_future = None
-        if Dictionary.server_infos['connected']:
+        if self._local_db.get_query(query) is None and self._is_connected():
             # Request the external database
-            fetch_future = asyncio.ensure_future(
-                self._fetch(
-                    'unitex',
-                    'compose',
-                    lem=lem,
-                    **param
-                ),
-                loop=self._async_loop
+            self._local_db.metrics.incr('misses')
+            fetch_future = self._start_fetch(
+                'unitex',
+                'compose',
+                lem=lem,
+                **param
             )
-        elif not Dictionary._is_pinging:
-            self._test_connection()
-
-        ret = list()
-        # Check the local database
+        # Check the local database, postings of lem and type are used first
         result = self._local_db.find(
-                self._create_word(**{
-                    'lem': lem,
-                    **param
-                })
+                searched,
+                accent_insensitive=accent_insensitive
         )
 
+        if fetch_future is None and \
+                self._need_fetch(query, result, all=True) and \
+                self._is_connected():
+            # Saved words are too old or removed
+            fetch_future = self._start_fetch(
+                'unitex',
+                'compose',
+                lem=lem,
+                **param
+            )
+
         if result:
             ret += result
         if fetch_future:
             # Get result from request
-            results = self._async_loop.run_until_complete(fetch_future) or []
-            for result in results:
-                result['lem'] = result['lem'] or result['label']
-                word = self._create_word(**result)
-                ret.append(word)  # Add result to return value
+            results = fetch_future.result()
+            if results is not None:
+                for result in results:
+                    result['lem'] = result['lem'] or result['label']
+                ret = self._read_through(
+                    query,
+                    searched,
+                    results,
+                    accent_insensitive=accent_insensitive
+                )
 
         return ret
 
@@ -255,25 +461,21 @@ class Dictionary():
         *word -- One result of find() or __getitem__()
 
         """
-        if not Dictionary.server_infos['connected']:
+        if not self._is_connected():
             # Cannot access to extarnal database
-            self._test_connection()
             return
         elif 'isFetched' in word and word['isFetched']:
             # This world is already fetched
             return
 
         # Request the datas from internet
-        fetch_future = self._async_loop.ensure_future(
-            self._fetch(
-                'dictionary',
-                word['lem'] or word['label'],
-                type=word['type']
-            ),
-            loop=self._async_loop
+        fetch_future = self._start_fetch(
+            'dictionary',
+            word['lem'] or word['label'],
+            type=word['type']
         )
         # Get result of request
-        results = self._async_loop.run_until_complete(fetch_future) or []
+        results = fetch_future.result() or []
         for result in results:
             result['isFetched'] = True
             self.update(
@@ -283,6 +485,80 @@ class Dictionary():
                 insertable=False
             )
 
+    def get_infos_on_many(self, words, concurrency=None):
+        """Get definitions, synonyms, and others datas on several words
+        (see get_infos_on) with at most 'concurrency' running requests,
+        and save them in one write.
+
+        Words already fetched are skipped and words with the same lem
+        and type are requested once. An error of a word does not stop
+        the others, errors are returned in the order of 'words' (None
+        for a word without error).
+
+        *words -- Results of find() or __getitem__()
+        *[concurrency] -- Max count of running API requests,
+                          by default DICTIONARY_API_POOL_SIZE
+
+        """
+        words = list(words)
+        if concurrency is None:
+            concurrency = settings.DICTIONARY_API_POOL_SIZE
+        if concurrency < 1:
+            raise TypeError('invalid concurrency argument')
+
+        errors = [None] * len(words)
+        groups = dict()  # (lem, type) -> indexes of words
+        for i, word in enumerate(words):
+            if 'isFetched' in word and word['isFetched']:
+                # This world is already fetched
+                continue
+            groups.setdefault(
+                (word['lem'] or word['label'], word['type']),
+                []
+            ).append(i)
+        if groups and not self._is_connected():
+            # Cannot access to extarnal database
+            error = ConnectionError('API Dictionary cannot be reached')
+            for indexes in groups.values():
+                for i in indexes:
+                    errors[i] = error
+            return errors
+
+        updated = dict()  # id of word -> saved word to update
+        fetches = self._fetch_many(
+            ((key, ('dictionary', key[0]), {'type': key[1]})
+             for key in groups),
+            concurrency
+        )
+        for key, results, request in fetches:
+            if results is None:
+                # Server cannot be reached or answered with an error
+                error = request.exception() or LookupError(
+                    'API Dictionary cannot answer on {}'.format(key[0])
+                )
+                for i in groups[key]:
+                    errors[i] = error
+                continue
+
+            for i in groups[key]:
+                for result in deepcopy(results or []):
+                    result['isFetched'] = True
+                    # Same merge than update(..., overwrite=False)
+                    for k in ('_id', 'isPersistent'):
+                        result.pop(k, None)
+                    self._copy_word(
+                        result,
+                        words[i],
+                        exceptions=['label', 'type']
+                    )
+                    if words[i]['isPersistent']:
+                        updated[id(words[i])] = words[i]
+
+        # All merged words are saved in one write
+        self._local_db.upsert_many(updated.values())
+
+        return errors
+
     def beautify(self, word: dict):
         """Return word repr, it remove keys with empty value.
 
@@ -335,6 +611,50 @@ class Dictionary():
 
         return word
 
+    def insert_many(self, words, force=False):
+        """Save several new words in the database in one write
+        and return them.
+
+        *words -- Iterable of words attributes (dict)
+        *[force] -- If True and a word is already exist, insert will
+                    make a copy and save it, else the word is ignored
+
+        """
+        new_words = list()
+        for word in self._create_words(words):
+            if word['isPersistent']:
+                if not force:
+                    # It seems to already be in the database
+                    continue
+                # Force the insertion
+                word['isPersistent'] = False
+            new_words.append(word)
+
+        # Insert in database
+        self._local_db.insert_many(new_words)
+
+        return new_words
+
+    def upsert_many(self, words):
+        """Save several words in the database in one write and return them.
+        A word already saved with the same label, type, lem and tags
+        is updated instead of being inserted.
+
+        *words -- Iterable of words attributes (dict)
+
+        """
+        new_words = self._create_words(words)
+        # Insert or update in database
+        self._local_db.upsert_many(new_words)
+
+        return new_words
+
+    def hold_eviction(self):
+        """Suspend cleaning of oldest words of the database in a block
+        (see LocalDictionary.hold_eviction).
+        """
+        return self._local_db.hold_eviction()
+
     def update(self, kw: dict, word: dict, overwrite=True, insertable=True):
         """Allow to update some field of 'word'.
 
@@ -450,41 +770,221 @@ class Dictionary():
         *[kwargs] -- Attributes of word
 
         """
-        new_word = dict(self._model)
+        # Lists of model must not be shared between words
+        new_word = deepcopy(self._model)
         # Initialize values of word according to parameters
         for k in kwargs.keys():
             new_word[k] = kwargs[k]
 
         return new_word
 
-    def _get_srv_avg_latence(self, word_list: list = None):
-        """Calculate average latence to request.
+    def _find_suggested(self, label, type=None):
+        """Return local words of the nearest labels of 'label'."""
+        ret = list()
+        suggestions = self._local_db.suggest(label, limit=None)
+        for suggestion, distance in suggestions:
+            if distance > suggestions[0][1]:
+                # Only the nearest labels
+                break
+            ret += self._local_db.find(
+                self._create_word(label=suggestion, type=type)
+            )
 
-        *word_list] -- List of word to search on external database
-                       for the calculation
+        return ret
 
+    def _need_fetch(self, query, words, all=False):
+        """Return if API has to be requested for 'query', when local
+        'words' are missing or too old, or if 'all' remote words are
+        asked and the query is not in cache.
         """
-        if not Dictionary.server_infos['connected']:
-            # Cannot access to the external database
-            return None
+        need = self._must_fetch(query, words, all)
+        self._local_db.metrics.incr('misses' if need else 'hits')
+
+        return need
+
+    def _must_fetch(self, query, words, all=False):
+        """Same as _need_fetch, without counting hits and misses."""
+        found = self._local_db.get_query(query)
+
+        return found is not False and (
+            # Not answered recently that API has no word
+            not words or any(self._local_db.is_stale(w) for w in words) or
+            (all and found is None)
+        )
+
+    def _cache_results(self, query, results):
+        """Save words returned by API for 'query' in local database,
+        with their fetch time and TTL, and return them.
+        A query without result is saved as a miss with a shorter TTL.
+
+        *query -- Key of the request (see transport.get_key)
+        *results -- Words returned by API
+
+        """
+        if not results:
+            self._local_db.set_query(
+                query,
+                False,
+                settings.LOCAL_DICT_NEGATIVE_TTL
+            )
+            return []
+
+        words, keys = self._prepare_results(results)
+        self._local_db.upsert_many(words, keys=keys)
+        self._local_db.set_query(query, True, settings.LOCAL_DICT_CACHE_TTL)
 
-        if not word_list:
-            # No word list specified
-            word_list = [
-                'dictionnaire',
-                'ranger',
-                'être',
-                'indispensable'
-            ]
+        return words
 
+    def _prepare_results(self, results):
+        """Return words of API 'results' with their fetch time and TTL,
+        and keys given by API (only these keys are updated on saved words).
+        """
+        fetched_at = time.time()
+        keys = {'fetchedAt', 'ttl'}
+        words = list()
+        for result in results:
+            if 'gram' in result:
+                result['type'] = result['gram'] or None
+            keys.update(result.keys())
+            result['fetchedAt'] = fetched_at
+            result['ttl'] = settings.LOCAL_DICT_CACHE_TTL
+            words.append(self._create_word(**result))
+
+        return words, keys
+
+    def _read_through(self, query, searched, results,
+                      accent_insensitive=False):
+        """Save API 'results' of 'query' and return local words matching
+        with 'searched', followed by remote words not saved.
+        """
+        words = self._cache_results(query, results)
+
+        return self._merge_words(
+            self._local_db.find(
+                searched,
+                accent_insensitive=accent_insensitive
+            ),
+            words
+        )
+
+    def _read_frequency_list(self, path, limit=None):
+        """Return the 'limit' first labels of a frequency list file."""
+        labels = list()
+        with open(path, encoding='utf-8-sig') as file:
+            for line in file:
+                if limit is not None and len(labels) >= limit:
+                    break
+                # Frequency after the label is not needed
+                label = line.split('\t')[0].strip()
+                if label and not label.startswith('#'):
+                    labels.append(label)
+
+        return labels
+
+    def _warm(self, future, labels, concurrency, progress=None):
+        """Run warm in its thread and give statistics to 'future'."""
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(
+                self._warm_labels(labels, concurrency, progress)
+            )
+        except Exception as e:
+            future.set_exception(e)
+
+    def _warm_labels(self, labels, concurrency, progress=None):
+        """Fetch labels missing in local database and return statistics
+        (see warm).
+        """
+        stats = {
+            'words': 0,  # Labels done
+            'known': 0,  # Already in local database
+            'fetched': 0,  # Found by API
+            'missing': 0,  # Unknown by API
+            'errors': 0,  # Not answered by API
+            'seconds': 0.0
+        }
         start_time = time.time()
-        for label in word_list:
-            # Request extarnal database
-            asyncio.run(
-                self._fetch('dictionary', label)
+
+        def report(**counts):
+            for key, count in counts.items():
+                stats[key] += count
+                stats['words'] += count
+            stats['seconds'] = time.time() - start_time
+            if progress is not None:
+                progress(dict(stats))
+
+        labels = list(dict.fromkeys(labels))
+        misses = deque()
+        for label in labels:
+            query = transport.get_key('unitex', label)
+            if self._must_fetch(query, self._local_db.find(
+                    self._create_word(label=label))):
+                misses.append(label)
+        report(known=len(labels) - len(misses))
+        probe = Dictionary._probe
+        if misses and probe is not None:
+            # Warming runs in background, it can wait server state
+            probe.join()
+        if misses and not self._is_connected():
+            # Nothing can be fetched
+            report(errors=len(misses))
+            misses.clear()
+
+        words, keys = list(), set()
+        queries = dict()  # query -> if words are found
+        fetches = self._fetch_many(
+            ((label, ('unitex', label), {}) for label in misses),
+            concurrency,
+            rate=settings.DICTIONARY_API_WARM_RATE
+        )
+        for label, results, request in fetches:
+            if results is None:
+                report(errors=1)
+                continue
+            queries[transport.get_key('unitex', label)] = bool(results)
+            if results:
+                new_words, new_keys = self._prepare_results(results)
+                words += new_words
+                keys |= new_keys
+                report(fetched=1)
+            else:
+                report(missing=1)
+
+        # All words are saved in one write
+        self._local_db.upsert_many(words, keys=keys)
+        for query, found in queries.items():
+            self._local_db.set_query(
+                query,
+                found,
+                settings.LOCAL_DICT_CACHE_TTL if found
+                else settings.LOCAL_DICT_NEGATIVE_TTL
             )
 
-        return (time.time() - start_time) / len(word_list)
+        return stats
+
+    def _merge_words(self, words, others):
+        """Return 'words' followed by 'others' not already in 'words'."""
+        ids = set(word['_id'] for word in words if '_id' in word)
+
+        return words + [
+            word for word in others
+            if '_id' not in word or word['_id'] not in ids
+        ]
+
+    def _create_words(self, words):
+        """Create and init structure of several words.
+
+        *words -- Iterable of words attributes (dict)
+
+        """
+        new_words = list()
+        for kwargs in words:
+            if 'label' not in kwargs or not kwargs['label']:
+                raise KeyError("no 'label' found, cannot insert this word")
+            new_words.append(self._create_word(**kwargs))
+
+        return new_words
 
     def _copy_word(self, word_src, word_dst, exceptions=[]):
         """Update a word by adding values if possible else replace it."""
@@ -507,101 +1007,160 @@ class Dictionary():
                 # Add value
                 word_dst[k] = v
 
-    async def _fetch(self, *args, _timeout=None, **kwargs):
-        """Allow to request external server."""
-        def kwargs_to_url(key, arg):
-            """Translate kwargs argument in url syntax."""
-            try:
-                arg = arg.strip()
-            except Exception:
-                pass
-            return '{}={}'.format(key, arg)
-
-        # Initialize additionals str_kwargs paramaters (kwargs)
-        str_kwargs = list()
-        # Translate kwargs argument in url syntax
-        for k, arg in kwargs.items():
-            if isinstance(arg, list):
-                for elem in arg:
-                    str_kwargs.append(kwargs_to_url(k, elem))
-            else:
-                str_kwargs.append(kwargs_to_url(k, arg))
+    def _run(self, coroutine):
+        """Run 'coroutine' on the event loop shared by all instances
+        and return its result, it can be called from any thread.
+        """
+        return transport.run_threadsafe(coroutine).result()
 
-        str_kwargs = '?{}'.format(
-                    '&'.join(str_kwargs)
-                )
-        # Construct the URL for request API
-        api_url = '{}/{}{}'.format(
-            settings.DICTIONARY_API_URL,
-            '/'.join(args),
-            str_kwargs if str_kwargs != '?' else ''
+    def _start_fetch(self, *args, _timeout=None, **kwargs):
+        """Start a request to external server now and return a
+        concurrent.futures.Future of its result.
+        """
+        # Request runs in transport threads while caller keeps working
+        future = transport.submit(*args, _timeout=_timeout, **kwargs)
+
+        return transport.run_threadsafe(self._wait_fetch(future))
+
+    async def _fetch(self, *args, _timeout=None, **kwargs):
+        """Allow to request external server, with keep-alive connections
+        shared by all instances (see transport.py).
+        """
+        return await self._wait_fetch(
+            transport.submit(*args, _timeout=_timeout, **kwargs)
         )
+
+    async def _wait_fetch(self, future):
+        """Return result of a started request without blocking the
+        event loop, None if server cannot answer.
+        """
+        metrics = self._local_db.metrics
+        start_time = time.perf_counter()
         try:
             # Request the API Dictionary
-            response = requests.get(
-                api_url,
-                headers=self._headers,
-                timeout=_timeout
-            )
+            result = await transport.wait(future)
+            metrics.incr('remote_calls')
+            metrics.record('fetch', time.perf_counter() - start_time)
 
-            if response.status_code == 200:
+            if result is not None:
                 # API response with no error
-                return json.loads(response.content.decode('utf-8'))
-        except requests.exceptions.ConnectionError:
-            pass
+                Dictionary.server_infos['connected'] = True
+                self._set_find_time_opti()
+                return result
+        except transport.CircuitOpenError:
+            # Server failed recently, local results only
+            return None
+        except (OSError, ValueError):
+            # Errors of requests are OSError
+            metrics.incr('remote_calls')
+            metrics.incr('remote_errors')
 
         Dictionary.server_infos['connected'] = False
         self._test_connection()
 
         return None
 
+    def _fetch_many(self, requests, concurrency, rate=None):
+        """Start several requests with at most 'concurrency' running
+        and return a generator of (key, result, request) in the order
+        of 'requests' (see _wait_fetch for result).
+
+        *requests -- Iterable of (key, args, kwargs) of transport.submit
+        *concurrency -- Max count of running requests
+        *[rate] -- Max count of requests started by second
+
+        """
+        requests = deque(requests)
+        running = deque()  # (key, started request)
+        interval = 1 / rate if rate else 0
+        next_time = time.monotonic()
+
+        def fill():
+            # Keep 'concurrency' requests running, at limited rate
+            nonlocal next_time
+            while requests and len(running) < concurrency:
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_time = max(next_time, time.monotonic()) + interval
+                key, args, kwargs = requests.popleft()
+                running.append((key, transport.submit(*args, **kwargs)))
+
+        def results():
+            while running:
+                key, request = running.popleft()
+                result = self._run(self._wait_fetch(request))
+                # Next request runs while caller uses this result
+                fill()
+                yield key, result, request
+
+        # Requests start now, not on first result
+        fill()
+        return results()
+
+    def _probe_server(self):
+        """Get server state, a server with an unexpected answer
+        stays disconnected.
+        """
+        with suppress(Exception):
+            self.get_server_state(timeout=1)
+
+    def _is_connected(self):
+        """Return if API can be requested, the first server probe is
+        waited at most DICTIONARY_API_CONNECT_TIMEOUT. If server is not
+        connected a reconnection is tried.
+        """
+        probe = Dictionary._probe
+        if probe is not None and probe.is_alive():
+            # Server state is not known yet
+            probe.join(settings.DICTIONARY_API_CONNECT_TIMEOUT)
+            if probe.is_alive():
+                # Too slow to answer, only local results are given
+                return False
+
+        if not Dictionary.server_infos['connected']:
+            self._test_connection()
+            return False
+
+        return True
+
     def _test_connection(self):
-        """Allow to launch a process that try to access to server."""
-        if Dictionary.server_infos['connected'] or Dictionary._is_pinging:
-            # Is already connected or pinging
+        """Ping server in background to know if it can be requested
+        again, unless the circuit of pings is open (server failed
+        recently, only local results are used until its delay is over).
+        """
+        if not transport.get_breaker('ping').is_ready():
             return
 
-        Dictionary._is_pinging = True
-        self._ping_server()
-
-    def _ping_server(self):
-        """Allow to initialize pinging thread and start it."""
-        def _ping_server_aux(e):
-            connected = False
-            waiting_time = 1  # Seconds
-
-            while not e.isSet():
-                # Ping the server
-                ping_time = float(
-                    asyncio.run(
-                        self._fetch('ping')
-                    ) or 0
-                ) or None
-                connected = ping_time is not None
-
-                if connected:
-                    # Connection is etablished with sucess
-                    e.set()
-                    Dictionary.server_infos['connected'] = True
-                    break
-                # Sleep and wait a potential signal
-                e.wait(waiting_time)
-                waiting_time *= (12 / 9)  # Extend sleeping time
-
-            Dictionary._is_pinging = False
-
-            if self._optimize:
-                # Calculate speed of server requesting (by default 4 words)
-                server_rq_speed = self._get_srv_avg_latence()
-                # Set find time optimization
-                self._local_db.find_time_opti = server_rq_speed
-
-        event = threading.Event()  # Init the stopping event
-        thread = threading.Thread(  # Create the pinging thread
-            name='ping-server',
-            target=_ping_server_aux,
-            args=(event, )
-        )
-        self._ping = (thread, event)
-        thread.setDaemon(True)
-        thread.start()
+        with Dictionary._ping_lock:
+            if Dictionary.server_infos['connected'] or \
+                    Dictionary._is_pinging:
+                # Is already connected or pinging
+                return
+
+            Dictionary._is_pinging = True
+        future = transport.submit('ping', _timeout=1)
+        future.add_done_callback(self._pinged)
+
+    def _pinged(self, future):
+        """Save server state from the answer of a ping."""
+        ping_time = None
+        with suppress(Exception):
+            ping_time = float(future.result() or 0) or None
+
+        if ping_time is not None:
+            # Connection is etablished with sucess
+            Dictionary.server_infos['connected'] = True
+            self._set_find_time_opti()
+        Dictionary._is_pinging = False
+
+    def _set_find_time_opti(self):
+        """Set max of time of local finds to the median latency of
+        searches on server, unset while no search is measured.
+        """
+        if not self._optimize:
+            return
+
+        latency = transport.get_breaker('unitex').get_latency(50)
+        if latency is not None:
+            self._local_db.find_time_opti = latency
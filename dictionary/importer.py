@@ -0,0 +1,188 @@
+"""Import of a Unitex DELAF dictionary into the local database.
+
+Each line of a DELAF file is like 'form,lemma.GRAM+semantic:flexional'
+(ex: 'abaissa,abaisser.V+z1:J3s'), an empty lemma means the lemma is
+the form itself. Lines are read one by one and saved by batches, so the
+file is never loaded in memory.
+
+Usage: python -m dictionary.importer <file> [--table dictionary]
+"""
+from copy import deepcopy
+import argparse
+import time
+
+from . import codec
+from .local_dictionary import LocalDictionary
+import settings
+
+
+def split_entry(line):
+    """Return (form, lemma, tag) of a DELAF line, None if the line is empty
+    or a comment. Characters escaped by '\\' are kept without it.
+
+    *line -- Line of DELAF file
+
+    """
+    parts = ['']
+    escaped = False
+    for char in line.rstrip('\r\n'):
+        if escaped:
+            parts[-1] += char
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == ',' and len(parts) == 1:
+            parts.append('')
+        elif char == '.' and len(parts) == 2:
+            parts.append('')
+        elif char == '/':
+            # Start of a comment
+            break
+        else:
+            parts[-1] += char
+
+    if parts == [''] or not parts[0].strip():
+        # Nothing to read
+        return None
+    if len(parts) != 3 or not parts[2]:
+        raise ValueError('invalid DELAF line: {!r}'.format(line))
+
+    form, lemma, tag = parts
+    return form, lemma or form, tag
+
+
+def iter_delaf(path, encoding=None, errors=None):
+    """Generate words of a DELAF file, one by line.
+
+    *path -- Path of DELAF file
+    *[encoding] -- Encoding of file, by default UTF-16 if the file starts
+                   with its BOM (as saved by Unitex) else UTF-8
+    *[errors] -- List where invalid lines are added, else they raise
+
+    """
+    if encoding is None:
+        with open(path, 'rb') as file:
+            bom = file.read(2)
+        encoding = 'utf-16' if bom in (b'\xff\xfe', b'\xfe\xff') \
+            else 'utf-8-sig'
+
+    model = LocalDictionary.DEFAULT_MODEL
+    with open(path, encoding=encoding) as file:
+        for line in file:
+            try:
+                entry = split_entry(line)
+            except ValueError:
+                if errors is None:
+                    raise
+                errors.append(line)
+                continue
+            if entry is None:
+                continue
+
+            form, lemma, tag = entry
+            word = deepcopy(model)
+            word.update(codec.decode_tag(tag))
+            word['label'] = form
+            word['lem'] = lemma
+            word['tags'] = tag
+            yield word
+
+
+def import_delaf(path, dictionary, batch_size=1000, progress=None,
+                 encoding=None):
+    """Save all words of a DELAF file in 'dictionary' and return
+    statistics of the import.
+
+    Words already saved (same label, type, lem and tags) are updated,
+    so a file can be imported again. Oldest words are not removed during
+    the import but once at its end, if the database is bigger than
+    LOCAL_DICT_MAX_SIZE: 'kept' counts words of the file still saved and
+    'evicted' all words removed.
+
+    *path -- Path of DELAF file
+    *dictionary -- Dictionary or LocalDictionary
+    *[batch_size] -- Count of words saved by write
+    *[progress] -- Function called with statistics after each write
+    *[encoding] -- Encoding of file (see iter_delaf)
+
+    """
+    errors = list()
+    stats = {
+        'words': 0,
+        'errors': 0,
+        'seconds': 0.0,
+        'words/s': 0.0,
+        'kept': 0,
+        'evicted': 0
+    }
+    saved_ids = set()
+    start_time = time.time()
+
+    def save(batch):
+        # A LocalDictionary sets '_id' on given words, a Dictionary
+        # returns new ones
+        saved = dictionary.upsert_many(batch) or batch
+        saved_ids.update(word['_id'] for word in saved)
+        stats['words'] += len(batch)
+        stats['errors'] = len(errors)
+        stats['seconds'] = time.time() - start_time
+        stats['words/s'] = stats['words'] / (stats['seconds'] or 1e-9)
+        if progress is not None:
+            progress(dict(stats))
+
+    with dictionary.hold_eviction() as removed:
+        batch = list()
+        for word in iter_delaf(path, encoding=encoding, errors=errors):
+            batch.append(word)
+            if len(batch) >= batch_size:
+                save(batch)
+                batch = list()
+        # Save the rest
+        save(batch)
+
+    stats['evicted'] = len(removed)
+    stats['kept'] = len(saved_ids.difference(removed))
+    return stats
+
+
+def main(args=None):
+    """Import a DELAF file from the command line."""
+    parser = argparse.ArgumentParser(
+        prog='python -m dictionary.importer',
+        description='Import a Unitex DELAF file in the local database.'
+    )
+    parser.add_argument('path', help='DELAF file')
+    parser.add_argument('--table', default='dictionary',
+                        help='name of database (default: dictionary)')
+    parser.add_argument('--engine', default=None,
+                        help="storage engine, 'json' or 'sqlite'")
+    parser.add_argument('--encoding', default=None, help='file encoding')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--max-size', type=int, default=None,
+                        help='LOCAL_DICT_MAX_SIZE in bytes for this import')
+    args = parser.parse_args(args)
+
+    if args.max_size is not None:
+        settings.LOCAL_DICT_MAX_SIZE = args.max_size
+
+    def print_progress(stats):
+        print('{words} words ({errors} errors) in {seconds:.1f}s '
+              '- {words/s:.0f} words/s'.format(**stats))
+
+    local_db = LocalDictionary(args.table, engine=args.engine)
+    try:
+        stats = import_delaf(
+            args.path,
+            local_db,
+            batch_size=args.batch_size,
+            progress=print_progress,
+            encoding=args.encoding
+        )
+        print('{kept} words kept, {evicted} removed to stay under '
+              'LOCAL_DICT_MAX_SIZE'.format(**stats))
+    finally:
+        local_db.close()
+
+
+if __name__ == '__main__':
+    main()
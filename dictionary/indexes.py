@@ -0,0 +1,196 @@
+"""In-memory indexes over labels of words, kept up to date by
+LocalDictionary on each insert, update and remove.
+"""
+from collections import deque
+import unicodedata
+
+
+def normalize(label):
+    """Return label without accents and case, 'Être' give 'etre'."""
+    return ''.join(
+        char for char in unicodedata.normalize('NFKD', label)
+        if not unicodedata.combining(char)
+    ).casefold()
+
+
+class _Node():
+    """Node of Trie."""
+
+    __slots__ = ('children', 'count')
+
+    def __init__(self):
+        self.children = dict()  # char -> _Node
+        self.count = 0  # Count of words ending on this node
+
+
+class Trie():
+    """Prefix tree of labels, used to complete a prefix."""
+
+    def __init__(self):
+        self._root = _Node()
+        self._len = 0  # Count of different labels
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, label):
+        node = self._get_node(label)
+        return node is not None and node.count > 0
+
+    def add(self, label):
+        """Add a label, a label can be added several times."""
+        node = self._root
+        for char in label:
+            node = node.children.setdefault(char, _Node())
+
+        if node.count == 0:
+            self._len += 1
+        node.count += 1
+
+    def remove(self, label):
+        """Remove one time a label."""
+        path = [self._root]
+        for char in label:
+            node = path[-1].children.get(char)
+            if node is None:
+                # Unknown label
+                return
+            path.append(node)
+
+        if path[-1].count == 0:
+            return
+        path[-1].count -= 1
+        if path[-1].count:
+            # Label still used
+            return
+
+        self._len -= 1
+        # Remove nodes not used anymore
+        for i in range(len(label), 0, -1):
+            if path[i].count or path[i].children:
+                break
+            del path[i - 1].children[label[i - 1]]
+
+    def complete(self, prefix):
+        """Generate labels starting by prefix, shortest labels first
+        then in alphabetical order.
+        """
+        node = self._get_node(prefix)
+        if node is None:
+            return
+
+        queue = deque([(prefix, node)])
+        while queue:
+            label, node = queue.popleft()
+            if node.count:
+                yield label
+            for char in sorted(node.children):
+                queue.append((label + char, node.children[char]))
+
+    def _get_node(self, prefix):
+        """Return node of prefix, None if no label start by prefix."""
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+
+        return node
+
+
+def edit_distance(a, b, max_distance=None):
+    """Return the Damerau-Levenshtein distance (optimal string alignment)
+    between a and b, or max_distance + 1 if it is greater than max_distance.
+    """
+    if a == b:
+        return 0
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    before_previous = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,  # Deletion
+                current[j - 1] + 1,  # Insertion
+                previous[j - 1] + (char_a != char_b)  # Substitution
+            )
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                # Transposition
+                current[j] = min(current[j], before_previous[j - 2] + 1)
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        before_previous, previous = previous, current
+
+    return previous[-1]
+
+
+class SymSpell():
+    """Index of labels by their deletions (symmetric delete algorithm),
+    used to suggest known labels near a misspelled one.
+    """
+
+    def __init__(self, max_distance=2, prefix_length=7):
+        """Create an empty index.
+
+        *[max_distance] -- Max distance of suggestions
+        *[prefix_length] -- Only deletions of label prefix are indexed
+
+        """
+        self.max_distance = max_distance
+        self._prefix_length = prefix_length
+        self._deletes = dict()  # deletion -> {label}
+
+    def add(self, label):
+        """Add a label to the index."""
+        for delete in self._get_deletes(label, self.max_distance):
+            self._deletes.setdefault(delete, set()).add(label)
+
+    def remove(self, label):
+        """Remove a label from the index."""
+        for delete in self._get_deletes(label, self.max_distance):
+            labels = self._deletes.get(delete)
+            if labels is not None:
+                labels.discard(label)
+                if not labels:
+                    del self._deletes[delete]
+
+    def suggest(self, label, max_distance=None, limit=None):
+        """Return (label, distance) of labels near 'label',
+        nearest first then in alphabetical order.
+
+        *label -- Misspelled label
+        *[max_distance] -- Max distance of suggestions (up to index one)
+        *[limit] -- Max count of suggestions, None for all
+
+        """
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+
+        candidates = set()
+        for delete in self._get_deletes(label, max_distance):
+            candidates.update(self._deletes.get(delete, ()))
+
+        suggestions = list()
+        for candidate in candidates:
+            distance = edit_distance(label, candidate, max_distance)
+            if distance <= max_distance:
+                suggestions.append((candidate, distance))
+        suggestions.sort(key=lambda suggestion: (suggestion[1], suggestion[0]))
+
+        return suggestions[:limit] if limit is not None else suggestions
+
+    def _get_deletes(self, label, max_distance):
+        """Return label prefix and its deletions up to max_distance."""
+        deletes = {label[:self._prefix_length]}
+        edits = set(deletes)
+        for distance in range(max_distance):
+            edits = {
+                edit[:i] + edit[i + 1:]
+                for edit in edits for i in range(len(edit))
+            }
+            deletes |= edits
+
+        return deletes
@@ -0,0 +1,197 @@
+"""Compiled read-only lexicon, opened with mmap so that words are read
+from the file without loading it (the file is shared by all processes
+through the page cache).
+
+Layout of a file (little endian):
+*header -- magic, version, count of words and offsets of indexes
+*records -- each word in JSON (UTF-8)
+*keys -- labels and lems of words, with and without accents (UTF-8)
+*indexes -- for 'label', 'lem', then both without accents and case,
+            entries sorted by key, an entry is
+            (key offset, key length, record offset, record length)
+
+Usage: python -m dictionary.lexicon <output> (--delaf <file> | --table <name>)
+"""
+import argparse
+import json
+import mmap
+import struct
+
+from .indexes import normalize
+
+MAGIC = b'DLEX'
+VERSION = 2
+# Keys indexed in a lexicon
+KEYS = ('label', 'lem')
+# Indexes of keys, then of keys without accents and case
+INDEXES = KEYS + tuple('norm_' + key for key in KEYS)
+HEADER = struct.Struct('<4sII' + 'Q' * len(INDEXES))
+ENTRY = struct.Struct('<QIQI')
+
+
+def compile_lexicon(words, path):
+    """Write words in a lexicon file and return the count of words.
+
+    *words -- Iterable of words
+    *path -- Path of lexicon file
+
+    """
+    records = list()
+    for word in words:
+        word = {k: v for k, v in word.items() if k not in ('_id', 'clock')}
+        word['isPersistent'] = False
+        keys = [word.get(key) or '' for key in KEYS]
+        keys += [normalize(key) for key in keys]
+        records.append((
+            json.dumps(word, ensure_ascii=False).encode('utf-8'),
+            [key.encode('utf-8') for key in keys]
+        ))
+
+    with open(path, 'wb') as file:
+        file.write(b'\0' * HEADER.size)
+        # Records
+        offsets = list()
+        for record, keys in records:
+            offsets.append((file.tell(), len(record)))
+            file.write(record)
+        # Keys of each index, a key is written once by record
+        entries = [list() for index in INDEXES]
+        for (offset, length), (record, keys) in zip(offsets, records):
+            key_offsets = dict()
+            for i, key in enumerate(keys):
+                if not key:
+                    continue
+                if key not in key_offsets:
+                    key_offsets[key] = file.tell()
+                    file.write(key)
+                entries[i].append((key, key_offsets[key], offset, length))
+        # Indexes sorted by key
+        index_offsets = list()
+        for index in entries:
+            index_offsets.append(file.tell())
+            index.sort(key=lambda entry: entry[0])
+            for key, key_offset, offset, length in index:
+                file.write(ENTRY.pack(key_offset, len(key), offset, length))
+        index_offsets.append(file.tell())
+
+        file.seek(0)
+        file.write(HEADER.pack(
+            MAGIC,
+            VERSION,
+            len(records),
+            *index_offsets[:-1]
+        ))
+
+    return len(records)
+
+
+class Lexicon():
+    """Read-only lexicon searched by binary search in a mapped file."""
+
+    def __init__(self, path):
+        """Open a lexicon file.
+
+        *path -- Path of lexicon file
+
+        """
+        self._path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._len, *offsets = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise TypeError('invalid lexicon file: {}'.format(path))
+        offsets.append(len(self._map))
+        # (offset, count of entries) of each index
+        self._indexes = {
+            index: (offsets[i], (offsets[i + 1] - offsets[i]) // ENTRY.size)
+            for i, index in enumerate(INDEXES)
+        }
+
+    def __len__(self):
+        return self._len
+
+    def get_path(self):
+        return self._path
+
+    def find(self, key, value, accent_insensitive=False):
+        """Return words that have 'value' as 'key' ('label' or 'lem').
+
+        *key -- Searched key
+        *value -- Searched value
+        *[accent_insensitive] -- Compare values without accents and case
+
+        """
+        if accent_insensitive:
+            key, value = 'norm_' + key, normalize(value)
+        return [
+            json.loads(record.decode('utf-8'))
+            for record in self._search(key, value.encode('utf-8'))
+        ]
+
+    def _search(self, key, value):
+        """Generate records matching with 'value' in index of 'key'."""
+        offset, count = self._indexes[key]
+        entry_key = self._entry_key
+
+        # Search first entry with key greater or equal to value
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if entry_key(offset, middle) < value:
+                low = middle + 1
+            else:
+                high = middle
+
+        while low < count:
+            key_offset, key_length, record_offset, record_length = \
+                ENTRY.unpack_from(self._map, offset + low * ENTRY.size)
+            if self._map[key_offset:key_offset + key_length] != value:
+                break
+            yield self._map[record_offset:record_offset + record_length]
+            low += 1
+
+    def _entry_key(self, offset, i):
+        """Return key of the entry 'i' of index at 'offset'."""
+        key_offset, key_length, _, _ = \
+            ENTRY.unpack_from(self._map, offset + i * ENTRY.size)
+
+        return self._map[key_offset:key_offset + key_length]
+
+    def close(self):
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+
+def main(args=None):
+    """Compile a lexicon from the command line."""
+    parser = argparse.ArgumentParser(
+        prog='python -m dictionary.lexicon',
+        description='Compile a read-only lexicon file.'
+    )
+    parser.add_argument('path', help='lexicon file to write')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--delaf', help='Unitex DELAF file')
+    source.add_argument('--table', help='name of a local database')
+    parser.add_argument('--engine', default=None,
+                        help="storage engine of table, 'json' or 'sqlite'")
+    args = parser.parse_args(args)
+
+    if args.delaf:
+        from .importer import iter_delaf
+        count = compile_lexicon(iter_delaf(args.delaf), args.path)
+    else:
+        from .local_dictionary import LocalDictionary
+        local_db = LocalDictionary(args.table, engine=args.engine)
+        try:
+            count = compile_lexicon(local_db.all(), args.path)
+        finally:
+            local_db.close()
+
+    print('{} words written in {}'.format(count, args.path))
+
+
+if __name__ == '__main__':
+    main()
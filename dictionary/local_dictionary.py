@@ -1,9 +1,15 @@
-from tinydb import Query
+from contextlib import contextmanager
+from copy import deepcopy
 from datetime import datetime
-import os
+import heapq
+import threading
 import time
 
-from .storage import Table
+from .indexes import SymSpell, Trie, normalize
+from .locks import RWLock
+from .metrics import Metrics
+from .storage import get_table_path, open_table
+from . import tags
 import settings
 
 
@@ -24,28 +30,103 @@ class LocalDictionary():
             'quotes': [],
             'isPersistent': False
         }
+    # Keys matched with a bitmask of their codes (see tags.BITS)
+    MASKED_KEYS = ('flexional', 'semantic')
+    # Keys that can be matched without accents and case
+    NORMALIZED_KEYS = ('label', 'lem')
 
     def __init__(self, dictionary_name='dictionary',
-                 find_time_opti: float = None):
-        # Create or open database
-        self._db = Table(table_name=dictionary_name)
-        self._path = self._db.get_table_path()  # Get database path
-        self._size = os.path.getsize(self._path)  # Database file size
-        self._len = len(self._db)  # Count of word in database
+                 find_time_opti: float = None, engine: str = None,
+                 lexicon: str = None):
+        # Read-only lexicon searched after the database (see lexicon.py)
+        self._lexicon = None
+        # Database is created or opened on first use (see _open)
+        self._name = dictionary_name
+        self._engine = engine
+        self._db = None
+        self._size = 0  # Database file size
+        # In-memory copy of the table (doc_id -> stored word)
+        self._words = dict()
+        # Hash indexes, each one map a key to an ordered set of doc_id
+        self._ids = dict()  # '_id' -> doc_id
+        self._labels = dict()  # label -> {doc_id}
+        self._labels_types = dict()  # (label, type) -> {doc_id}
+        self._lems = dict()  # lem -> {doc_id}
+        self._types = dict()  # type -> {doc_id}
+        # Without accents and case (see indexes.normalize)
+        self._norm_labels = dict()  # normalized label -> {doc_id}
+        self._norm_lems = dict()  # normalized lem -> {doc_id}
+        # Bitmasks of masked keys (doc_id -> {key: mask})
+        self._masks = dict()
+        # Prefix tree of labels
+        self._trie = Trie()
+        # Deletions index of labels, built in background when opening
+        self._symspell = None
+        # (label, added) changed while the index is built, else None
+        self._symspell_changes = None
+        # Only one thread builds the index
+        self._symspell_lock = threading.Lock()
+        self._len = 0  # Count of word in database
         self.find_time_opti = find_time_opti  # Max of time for find request
-        # (sum of find speed, count find speed sumed)
-        self._find_speed = (0, 0)
+        # Counters and latencies (see Dictionary.stats)
+        self.metrics = Metrics()
+        # (count, sum) of find latencies at the last cleaning
+        self._find_speed = (0, 0.0)
         # Factor to get a sample of find speed
         self._sample_find_speed = True
-
-        if self._size - settings.LOCAL_DICT_MAX_SIZE > 0:
-            # size of file database is greater than (5Mb)
-            self._clean_oldest()
+        # Count of blocks where cleaning is suspended (see hold_eviction)
+        self._eviction_holds = 0
+        # Clocks touched in memory and not yet saved (doc_id -> clock)
+        self._clocks = dict()
+        self._clocks_timer = None
+        # Remote queries already answered (query -> (expiry, found))
+        self._queries = dict()
+        # Lookups read indexes together, writes of indexes and database
+        # (by any thread or the flushing timer) are alone
+        self._rwlock = RWLock()
+        # Protect clocks buffer, find speed and answered queries
+        self._mutex = threading.Lock()
+
+        # Can raise, once the state used by close is set
+        self._path = get_table_path(dictionary_name, engine)
+        if lexicon:
+            from .lexicon import Lexicon
+            self._lexicon = Lexicon(lexicon)
 
     def __len__(self):
-        self._len = len(self._db)
+        self._open()
+        self._len = len(self._words)
         return self._len
 
+    def _open(self):
+        """Create or open database and load it in memory, only
+        the first time it is called.
+        """
+        if self._db is not None:
+            # Already opened
+            return
+
+        with self._rwlock.write():
+            if self._db is not None:
+                return
+            db = open_table(self._name, self._engine)
+            for doc in db.all():
+                self._index(doc.doc_id, dict(doc))
+            self._db = db
+            self._size = self._db.get_size()
+            self._len = len(self._words)
+
+            if self._size - settings.LOCAL_DICT_MAX_SIZE > 0:
+                # size of file database is greater than (5Mb)
+                self._clean_oldest()
+
+        # Suggestions are ready without blocking lookups and writes
+        threading.Thread(
+            name='build-suggestions',
+            target=self._build_symspell,
+            daemon=True
+        ).start()
+
     def __del__(self):
         """Close the database"""
         self.close()
@@ -70,7 +151,121 @@ class LocalDictionary():
 
         return (time.time() - start_time) / len(word_list)
 
-    def find(self, word):
+    def find(self, word, accent_insensitive=False):
+        """Return saved words matching with all filled keys of 'word'.
+
+        *word -- Word with searched values
+        *[accent_insensitive] -- Compare label and lem without accents
+                                 and case
+
+        """
+        self._open()
+        start_time = time.perf_counter()
+        results = list()
+        masks = self._query_masks(word)
+        if accent_insensitive:
+            word = dict(word)
+            for key in self.NORMALIZED_KEYS:
+                if isinstance(word[key], str):
+                    word[key] = normalize(word[key])
+        flush = False
+        with self._rwlock.read():
+            for doc_id in self._candidates(word, accent_insensitive):
+                doc = self._words[doc_id]
+                if not self._match(doc, self._masks[doc_id], word, masks,
+                                   accent_insensitive):
+                    continue
+                # Element found
+                flush = self._touch(doc_id) or flush
+                result = deepcopy(doc)
+                del result['clock']
+                results.append(result)
+        if flush:
+            # Enough clocks are waiting
+            self.flush_clocks()
+        if self._lexicon is not None:
+            results += self._find_in_lexicon(word, masks, results,
+                                             accent_insensitive)
+
+        self.metrics.record('find', time.perf_counter() - start_time)
+        if self.find_time_opti and self._sample_find_speed:
+            self._check_find_speed()
+
+        return results
+
+    def _candidates(self, word, accent_insensitive=False):
+        """Return doc_id of words that can match with 'word',
+        by intersecting postings of its indexed keys.
+        """
+        label, lem, type = word['label'], word['lem'], word['type']
+        labels, lems = self._labels, self._lems
+        if accent_insensitive:
+            # Label and lem of 'word' are already normalized
+            labels, lems = self._norm_labels, self._norm_lems
+
+        postings = list()
+        if label and type and not accent_insensitive:
+            postings.append(self._labels_types.get((label, type), {}))
+        else:
+            if label:
+                postings.append(labels.get(label, {}))
+            if type:
+                postings.append(self._types.get(type, {}))
+        if lem:
+            postings.append(lems.get(lem, {}))
+
+        if not postings:
+            # No indexed key, have to check every words
+            return list(self._words)
+
+        # Walk through the smallest posting
+        postings.sort(key=len)
+        smallest, others = postings[0], postings[1:]
+
+        return [
+            doc_id for doc_id in smallest
+            if all(doc_id in posting for posting in others)
+        ]
+
+    def _query_masks(self, word):
+        """Return bitmasks of masked keys filled in 'word', a mask is None
+        when the key contains values without code.
+        """
+        masks = dict()
+        for key in self.MASKED_KEYS:
+            if word[key]:
+                mask, unknown = tags.get_mask_of(key, word[key])
+                masks[key] = None if unknown else mask
+
+        return masks
+
+    def _find_in_lexicon(self, word, masks, results,
+                         accent_insensitive=False):
+        """Return words of lexicon matching with 'word' that are not
+        already in 'results'.
+        """
+        if word['label']:
+            docs = self._lexicon.find('label', word['label'],
+                                      accent_insensitive)
+        elif word['lem']:
+            docs = self._lexicon.find('lem', word['lem'], accent_insensitive)
+        else:
+            # Lexicon can only be searched by label or lem
+            return []
+
+        found = set(self._word_key(result) for result in results)
+        return [
+            doc for doc in docs
+            if self._word_key(doc) not in found and
+            self._match(doc, self._get_masks(doc), word, masks,
+                        accent_insensitive)
+        ]
+
+    def _match(self, doc, doc_masks, word, masks, accent_insensitive=False):
+        """Return if 'doc' match with all filled keys of 'word',
+        'doc_masks' and 'masks' are their bitmasks (see _query_masks).
+        With 'accent_insensitive', label and lem of 'word' are normalized.
+        """
         def list_contains(lst, *sub):
             """ Return if 'lst' contains a list or a list of list
                 that contain 'sub'
@@ -82,95 +277,162 @@ class LocalDictionary():
             else:
                 return all([x in lst for x in sub])
 
-        start_time = time.time()
-        Word = Query()
-        query = None
         for key in self.DEFAULT_MODEL.keys():
-            if word[key]:
-                if isinstance(self.DEFAULT_MODEL[key], list) and \
-                   key in ['flexional', 'semantic']:
-                    tmp_query = (getattr(Word, key).test(
-                        list_contains,
-                        *word[key]
-                    ))
-                else:
-                    tmp_query = (getattr(Word, key) == word[key])
-
-                if query is None:
-                    # Initialize the query
-                    query = tmp_query
-                else:
-                    query = (query & tmp_query)
-
-        results = self._db.search(query)
-
-        if results:
-            # Elements found
-            for result in results:
-                self._update_clock(result, persistent=True)
-                del result['clock']
-
-        execution_time = time.time() - start_time
-        if self.find_time_opti and self._sample_find_speed:
-            self._find_speed_tracing(execution_time)
-
-        return results
+            if not word[key]:
+                continue
+            if key not in doc:
+                return False
+            if key in self.MASKED_KEYS and masks[key] is not None:
+                # Word has to contain all codes of the query
+                if doc_masks[key] & masks[key] != masks[key]:
+                    return False
+            elif key in self.MASKED_KEYS:
+                if not list_contains(doc[key], *word[key]):
+                    return False
+            elif accent_insensitive and key in self.NORMALIZED_KEYS and \
+                    isinstance(doc[key], str):
+                if normalize(doc[key]) != word[key]:
+                    return False
+            elif doc[key] != word[key]:
+                return False
 
-    def _find_speed_tracing(self, delay):
-        # Find time optimization is up
-        total_time, count = self._find_speed
-        total_time += delay
-        count += 1
-        # Update find speed variable
-        self._find_speed = (total_time, count)
-        self._sample_find_speed = False
-        # Calculate average find speed
-        find_speed = total_time / count
-        if find_speed > self.find_time_opti:
+        return True
+
+    def _check_find_speed(self):
+        """Clean oldest words if finds since the last cleaning are
+        slower than find_time_opti on average.
+        """
+        count, total = self.metrics.get_sum('find')
+        with self._mutex:
+            self._sample_find_speed = False
+            last_count, last_total = self._find_speed
+            if count < last_count:
+                # Metrics have been reset
+                last_count, last_total = 0, 0.0
+            if count == last_count:
+                return
+            too_slow = (total - last_total) / (count - last_count) > \
+                self.find_time_opti
+            if too_slow:
+                self._find_speed = (count, total)
+
+        if too_slow:
             self._clean_oldest()
-            self._find_speed = (0, 0)
 
     def insert(self, word):
-        if word['isPersistent']:
-            raise KeyError("invalid action, try to adding an existint")
-        # Adding 'clock' value
-        word['clock'] = None
-        # Adding print to this object, has saved in local
-        word['isPersistent'] = True
-        word['_id'] = id(word)
-        # Insert in database
-        self._db.insert(word)
-        # Adding 'clock' value
-        self._update_clock(word, persistent=True)
-        del word['clock']
-
-        # Update size of file database variable
-        self._size = os.path.getsize(self._path)
-        self._len = len(self._db)
-        # Active get find speed
-        self._sample_find_speed = True
-
-        if self._size - settings.LOCAL_DICT_MAX_SIZE > 0:
-            # size of file database is greater than 5M
-            self._clean_oldest()
+        # Saved with its 'clock' value in one write
+        self.write_many(inserts=[word])
+
+    def insert_many(self, words):
+        """Insert several new words in one write."""
+        self.write_many(inserts=words)
+
+    def upsert_many(self, words, keys=None):
+        """Update several words, or insert them if they are not
+        already saved, in one write.
+
+        A not persistent word is updated when a saved word have
+        the same label, type, lem and tags.
+
+        *words -- Words to save
+        *[keys] -- Keys updated on saved words, all keys of word if None
+
+        """
+        self.write_many(upserts=words, keys=keys)
+
+    def write_many(self, inserts=(), upserts=(), keys=None):
+        """Insert and upsert several words in one write,
+        only 'keys' of upserted words are updated if it is given.
+        """
+        inserts, upserts = list(inserts), list(upserts)
+        if not inserts and not upserts:
+            # Nothing to write
+            return
+        for word in inserts:
+            if word['isPersistent']:
+                raise KeyError("invalid action, try to adding an existint")
+
+        self._open()
+        clock = datetime.timestamp(datetime.now())
+        with self._rwlock.write():
+            new_words = list()  # Words to insert
+            new_keys = dict()  # Identity of word -> word to insert
+            updates = dict()  # doc_id -> fields to update
+            for word in upserts:
+                doc_id = self._ids.get(word['_id']) \
+                    if word['isPersistent'] else self._find_same(word)
+                if doc_id is None and self._word_key(word) in new_keys:
+                    # Already inserted by this batch
+                    new_word = new_keys[self._word_key(word)]
+                    new_word.update(self._word_fields(word, keys))
+                    word['_id'] = new_word['_id']
+                    word['isPersistent'] = True
+                elif doc_id is None:
+                    new_keys[self._word_key(word)] = word
+                    inserts.append(word)
+                else:
+                    # Update the saved word
+                    fields = updates.setdefault(doc_id, dict())
+                    fields.update(self._word_fields(word, keys))
+                    fields['clock'] = clock
+                    self._clocks.pop(doc_id, None)
+                    word['_id'] = self._words[doc_id]['_id']
+                    word['isPersistent'] = True
+
+            new_ids = set()
+            for word in inserts:
+                # Adding 'clock' value and print of saved word
+                word['clock'] = clock
+                word['isPersistent'] = True
+                word['_id'] = self._new_id(word, new_ids)
+                new_ids.add(word['_id'])
+                new_words.append(word)
+
+            # Write all words in database
+            with self.metrics.time('write'):
+                doc_ids = self._db.write_batch(new_words, updates)
+
+            for doc_id, fields in updates.items():
+                # Re-index the word with its new values
+                doc = self._unindex(doc_id)
+                doc.update(deepcopy(fields))
+                self._index(doc_id, doc)
+            for doc_id, word in zip(doc_ids, new_words):
+                self._index(doc_id, deepcopy(word))
+                del word['clock']
+
+            # Update size of file database variable
+            self._size = self._db.get_size()
+            self._len = len(self._words)
+            # Active get find speed
+            self._sample_find_speed = True
+
+            if self._size - settings.LOCAL_DICT_MAX_SIZE > 0:
+                # size of file database is greater than 5M
+                self._clean_oldest()
 
     def update(self, kw, word):
         if not word['isPersistent']:
             raise KeyError("invalid 'word' argument, cannot update")
 
-        Word = Query()
         if 'clock' in kw:
             # External cannot edit clock value
             del kw['clock']
 
-        # Update matching word from database
-        self._db.update(
-            kw,
-            Word._id == word['_id']
-        )
-        # Update 'clock' value
-        self._update_clock(word, persistent=True)
-        del word['clock']
+        self._open()
+        with self._rwlock.write():
+            doc_id = self._ids.get(word['_id'])
+            if doc_id is not None:
+                # Update matching word from database with its 'clock' value
+                self._clocks.pop(doc_id, None)
+                fields = dict(kw)
+                fields['clock'] = datetime.timestamp(datetime.now())
+                with self.metrics.time('write'):
+                    self._db.update(fields, doc_ids=[doc_id])
+                # Re-index the word with its new values
+                doc = self._unindex(doc_id)
+                doc.update(deepcopy(fields))
+                self._index(doc_id, doc)
         # Active get find speed
         self._sample_find_speed = True
 
@@ -179,63 +441,393 @@ class LocalDictionary():
                 '_id' not in word:
             raise KeyError("invalid 'word' argument, cannot remove")
 
-        Word = Query()
-        # Remove matching word from database
-        self._db.remove(
-            Word._id == word['_id']
-        )
+        self._open()
+        with self._rwlock.write():
+            doc_id = self._ids.get(word['_id'])
+            if doc_id is not None:
+                # Remove matching word from database
+                self._clocks.pop(doc_id, None)
+                with self.metrics.time('write'):
+                    self._db.remove(doc_ids=[doc_id])
+                self._unindex(doc_id)
+            # Re-evaluated values
+            self._size = self._db.get_size()
+            self._len = len(self._words)
         # Remove print to this object
         word['isPersistent'] = False
         del word['_id']
-        # Re-evaluated values
-        self._size = os.path.getsize(self._path)
-        self._len = len(self._db)
         # Active get find speed
         self._sample_find_speed = True
 
-    def _update_clock(self, word, persistent=False):
-        # Add or update 'clock' field
-        word['clock'] = datetime.now()
-
-        if persistent and word['isPersistent']:
-            # Save in database
-            # Update matching word from database
-            Word = Query()
-            self._db.update(
-                {'clock': datetime.timestamp(word['clock'])},
-                Word._id == word['_id']
-            )
+    def _find_same(self, word):
+        """Return doc_id of a saved word with the same identity
+        than 'word' (label, type, lem and tags).
+        """
+        key = self._word_key(word)
+        for doc_id in self._labels.get(word['label'], {}):
+            if self._word_key(self._words[doc_id]) == key:
+                return doc_id
+
+        return None
+
+    def _word_key(self, word):
+        """Return the identity of a word."""
+        return tuple(word.get(key) for key in ('label', 'type', 'lem', 'tags'))
+
+    def _word_fields(self, word, keys=None):
+        """Return fields of 'word' that can be saved by an update,
+        only 'keys' if it is given.
+        """
+        return {
+            k: v for k, v in word.items()
+            if k not in ('_id', 'isPersistent', 'clock') and
+            (keys is None or k in keys)
+        }
+
+    def is_stale(self, word):
+        """Return if 'word' is a remote result older than its TTL
+        (see get_query), words saved by user never expire.
+        """
+        if word.get('fetchedAt') is None or word.get('ttl') is None:
+            return False
+
+        return word['fetchedAt'] + word['ttl'] < time.time()
+
+    def get_query(self, query):
+        """Return if a remote query found words, None if it is unknown
+        or older than its TTL.
+
+        *query -- Hashable key of the query
+
+        """
+        with self._mutex:
+            if query not in self._queries:
+                return None
+            expiry, found = self._queries[query]
+            if expiry < time.time():
+                # Answer is too old
+                del self._queries[query]
+                return None
+
+        return found
+
+    def set_query(self, query, found, ttl):
+        """Save the answer of a remote query, a query that found
+        nothing is a miss (negative caching).
+
+        *query -- Hashable key of the query
+        *found -- If the query returned words
+        *ttl -- Seconds before the answer is too old
+
+        """
+        now = time.time()
+        with self._mutex:
+            self._queries.pop(query, None)
+            self._queries[query] = (now + ttl, found)
+
+            if len(self._queries) > settings.LOCAL_DICT_MAX_QUERIES:
+                # Remove expired answers, then oldest ones
+                for key, (expiry, found) in list(self._queries.items()):
+                    if expiry < now:
+                        del self._queries[key]
+                while len(self._queries) > settings.LOCAL_DICT_MAX_QUERIES:
+                    del self._queries[next(iter(self._queries))]
+
+    def _new_id(self, word, reserved=()):
+        """Return an '_id' based on 'word' that is not already used."""
+        _id = id(word)
+        while _id in self._ids or _id in reserved:
+            _id += 1
+
+        return _id
+
+    def _index(self, doc_id, doc):
+        """Add stored 'doc' to in-memory table and indexes."""
+        self._words[doc_id] = doc
+        if '_id' in doc:
+            self._ids[doc['_id']] = doc_id
+        for index, key in self._index_keys(doc):
+            index.setdefault(key, dict())[doc_id] = None
+        self._masks[doc_id] = self._get_masks(doc)
+
+        label = doc.get('label')
+        if isinstance(label, str) and label and \
+                len(self._labels[label]) == 1:
+            # First word with this label
+            self._trie.add(label)
+            if self._symspell is not None:
+                self._symspell.add(label)
+            if self._symspell_changes is not None:
+                self._symspell_changes.append((label, True))
+
+    def _get_masks(self, doc):
+        """Return bitmasks of masked keys of a stored word."""
+        return {
+            key: tags.get_mask_of(key, doc.get(key) or [])[0]
+            for key in self.MASKED_KEYS
+        }
+
+    def _unindex(self, doc_id):
+        """Remove word of 'doc_id' from in-memory table and indexes,
+        and return it.
+        """
+        doc = self._words.pop(doc_id)
+        del self._masks[doc_id]
+        if '_id' in doc:
+            self._ids.pop(doc['_id'], None)
+        for index, key in self._index_keys(doc):
+            bucket = index[key]
+            del bucket[doc_id]
+            if not bucket:
+                # No more word with this key
+                del index[key]
+
+        label = doc.get('label')
+        if isinstance(label, str) and label and label not in self._labels:
+            self._trie.remove(label)
+            if self._symspell is not None:
+                self._symspell.remove(label)
+            if self._symspell_changes is not None:
+                self._symspell_changes.append((label, False))
+
+        return doc
+
+    def _index_keys(self, doc):
+        """Return (index, key) pairs where 'doc' has to be referenced."""
+        keys = list()
+        label, lem, type = doc.get('label'), doc.get('lem'), doc.get('type')
+        if label:
+            keys.append((self._labels, label))
+            if type:
+                keys.append((self._labels_types, (label, type)))
+        if lem:
+            keys.append((self._lems, lem))
+        if type:
+            keys.append((self._types, type))
+        if isinstance(label, str) and label:
+            keys.append((self._norm_labels, normalize(label)))
+        if isinstance(lem, str) and lem:
+            keys.append((self._norm_lems, normalize(lem)))
+
+        return keys
+
+    def _touch(self, doc_id, clock=None):
+        """Update in memory the clock of a stored word and return if
+        enough clocks are waiting to be saved (see flush_clocks), else
+        they are saved after a delay. Lock has to be held for reading.
+        """
+        if clock is None:
+            clock = datetime.timestamp(datetime.now())
+
+        self._words[doc_id]['clock'] = clock
+        with self._mutex:
+            self._clocks[doc_id] = clock
+
+            if len(self._clocks) >= settings.LOCAL_DICT_CLOCK_FLUSH_COUNT:
+                return True
+            if self._clocks_timer is None:
+                # Flush waiting clocks later
+                self._clocks_timer = threading.Timer(
+                    settings.LOCAL_DICT_CLOCK_FLUSH_DELAY,
+                    self.flush_clocks
+                )
+                self._clocks_timer.daemon = True
+                self._clocks_timer.start()
+
+        return False
+
+    def flush_clocks(self):
+        """Save in database all clocks waiting in memory."""
+        with self._rwlock.write():
+            with self._mutex:
+                if self._clocks_timer is not None:
+                    self._clocks_timer.cancel()
+                    self._clocks_timer = None
+                if not self._clocks:
+                    # Nothing to save
+                    return
+                clocks, self._clocks = self._clocks, dict()
+
+            with self.metrics.time('flush_clocks'):
+                self._db.update_many({
+                    doc_id: {'clock': clock}
+                    for doc_id, clock in clocks.items()
+                })
 
     def _clean_oldest(self):
-        datas = self._db.all()
-        min_count = settings.LOCAL_DICT_MIN_COUNT
-        self._size = os.path.getsize(self._path)
-        final_size = int(float(self._size) * settings.LOCAL_DICT_CLEAN_COEF)
-
-        for word in sorted(
-            datas,
-            key=lambda word: word['clock']
-        ):
-            # Remove oldest item
-            self.remove(word)
-
-            if len(self) <= min_count:
-                # Number of items min has been reached
-                break
-            elif self._size - final_size <= 0:
-                # Size of file is correctly reduce
-                break
+        """Remove oldest words until the database is small enough
+        and return their '_id', nothing is done during hold_eviction.
+        """
+        if self._eviction_holds:
+            return []
+
+        with self._rwlock.write(), self.metrics.time('eviction'):
+            self._size = self._db.get_size()
+            final_size = int(
+                float(self._size) * settings.LOCAL_DICT_CLEAN_COEF
+            )
+            # Count of words that can be removed
+            removable = len(self._words) - settings.LOCAL_DICT_MIN_COUNT
+            # Clocks in memory are up to date, oldest words are on top
+            heap = [
+                (doc.get('clock') or 0, doc_id)
+                for doc_id, doc in self._words.items()
+            ]
+            heapq.heapify(heap)
+
+            victims = list()
+            freed_size = 0
+            while heap and len(victims) < removable and \
+                    self._size - freed_size > final_size:
+                # Take the oldest item
+                clock, doc_id = heapq.heappop(heap)
+                victims.append(doc_id)
+                freed_size += self._db.estimate_size(
+                    doc_id,
+                    self._words[doc_id]
+                )
+
+            removed = list()
+            for doc_id in victims:
+                self._clocks.pop(doc_id, None)
+                removed.append(self._words[doc_id]['_id'])
+            # Clocks have to be saved before words are removed
+            self.flush_clocks()
+            if victims:
+                # Remove all oldest items in one write
+                self._db.remove(doc_ids=victims)
+                for doc_id in victims:
+                    self._unindex(doc_id)
+            self.metrics.incr('evictions', len(victims))
+
+            self._size = self._db.get_size()
+            self._len = len(self._words)
+            # Active get find speed
+            self._sample_find_speed = True
+
+        return removed
+
+    @contextmanager
+    def hold_eviction(self):
+        """Suspend cleaning of oldest words in a block, so words written
+        by a big import are not removed while it is running. The database
+        is cleaned once at the end of the block if it is bigger than
+        LOCAL_DICT_MAX_SIZE, the yielded list gets '_id' of removed words.
+        """
+        removed = list()
+        with self._mutex:
+            self._eviction_holds += 1
+        try:
+            yield removed
+        finally:
+            with self._mutex:
+                self._eviction_holds -= 1
+            if self._db is not None and \
+                    self._size - settings.LOCAL_DICT_MAX_SIZE > 0:
+                removed += self._clean_oldest()
+
+    def complete(self, prefix, limit=10, type=None):
+        """Return labels starting by 'prefix', shortest first.
+
+        *prefix -- Start of labels
+        *[limit] -- Max count of labels, None for all
+        *[type] -- Type of word that need to match to
+
+        """
+        self._open()
+        labels = list()
+        with self._rwlock.read():
+            for label in self._trie.complete(prefix):
+                if limit is not None and len(labels) >= limit:
+                    break
+                if type is None or (label, type) in self._labels_types:
+                    labels.append(label)
+
+        return labels
+
+    def suggest(self, label, max_distance=2, limit=10):
+        """Return (label, distance) of saved labels near 'label',
+        nearest first.
+
+        *label -- Misspelled label
+        *[max_distance] -- Max count of edits between labels
+        *[limit] -- Max count of suggestions, None for all
+
+        """
+        self._open()
+        # Wait the index built when opening, or a farther one
+        self._build_symspell(max_distance)
+
+        with self._rwlock.read():
+            return self._symspell.suggest(
+                label,
+                max_distance=max_distance,
+                limit=limit
+            )
+
+    def _build_symspell(self, max_distance=2):
+        """Build index of all saved labels used by suggest, if it is not
+        already built for 'max_distance'. Lookups and writes are not
+        blocked: labels changed during the build are applied at its end.
+        """
+        with self._symspell_lock:
+            if self._symspell is not None and \
+                    self._symspell.max_distance >= max_distance:
+                # Already built
+                return
+
+            with self._rwlock.read():
+                labels = [
+                    label for label in self._labels
+                    if isinstance(label, str)
+                ]
+                self._symspell_changes = list()
+
+            symspell = SymSpell(max_distance=max(max_distance, 2))
+            for label in labels:
+                symspell.add(label)
+
+            with self._rwlock.write():
+                for label, added in self._symspell_changes:
+                    if label is None:
+                        # Database has been purged
+                        symspell = SymSpell(max_distance=symspell.max_distance)
+                    elif added:
+                        symspell.add(label)
+                    else:
+                        symspell.remove(label)
+                self._symspell = symspell
+                self._symspell_changes = None
 
     def all(self):
-        return self._db.all()
+        self._open()
+        with self._rwlock.read():
+            return [deepcopy(doc) for doc in self._words.values()]
 
     def purge(self):
-        self._db.truncate()
-        # Reinitialize instance value
-        self._size = os.path.getsize(self._path)
-        self._len = len(self._db)
-        self._find_speed = (0, 0)
+        self._open()
+        with self._rwlock.write():
+            self._db.truncate()
+            # Reinitialize instance value
+            for index in (self._words, self._ids, self._labels,
+                          self._labels_types, self._lems, self._types,
+                          self._norm_labels, self._norm_lems, self._masks,
+                          self._clocks, self._queries):
+                index.clear()
+            self._trie = Trie()
+            self._symspell = None
+            if self._symspell_changes is not None:
+                # Labels of the index being built are removed too
+                self._symspell_changes.append((None, False))
+            self._size = self._db.get_size()
+        self._len = len(self._words)
+        self._find_speed = self.metrics.get_sum('find')
         self._sample_find_speed = True
 
     def close(self):
-        self._db.close()
+        self.flush_clocks()
+        with self._rwlock.write():
+            if self._db is not None:
+                self._db.close()
+            if self._lexicon is not None:
+                self._lexicon.close()
@@ -0,0 +1,75 @@
+"""Locks shared by the classes of the package."""
+from contextlib import contextmanager
+import threading
+
+
+class RWLock():
+    """Readers-writer lock: several threads can read at the same time,
+    a writer is alone. Waiting writers go before new readers.
+
+    The writer can acquire the lock again (for writing or reading),
+    a reader must not acquire it again.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0  # Count of threads reading
+        self._writer = None  # Ident of thread writing
+        self._writes = 0  # Count of acquisitions by writer
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        """Hold the lock for reading."""
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """Hold the lock for writing."""
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
+
+    def acquire_read(self):
+        with self._condition:
+            if self._writer == threading.get_ident():
+                # Writer also reads
+                self._writes += 1
+                return
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            if self._writer == threading.get_ident():
+                self._writes -= 1
+                return
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            if self._writer == threading.get_ident():
+                self._writes += 1
+                return
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = threading.get_ident()
+            self._writes = 1
+
+    def release_write(self):
+        with self._condition:
+            self._writes -= 1
+            if not self._writes:
+                self._writer = None
+                self._condition.notify_all()
@@ -0,0 +1,131 @@
+"""Counters and latency histograms of a dictionary, given by
+Dictionary.stats().
+
+Histograms keep latencies in buckets of logarithmic width (as HDR
+histograms): memory does not grow with the count of values and each
+percentile is known with a relative error below 1 / 2**SUB_BITS.
+"""
+from contextlib import contextmanager
+import math
+import threading
+import time
+
+SUB_BITS = 6  # Buckets by power of 2, error below 1.6 %
+UNIT = 1e-6  # Latencies are counted in microseconds
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram():
+    """Distribution of latencies, in seconds."""
+
+    def __init__(self):
+        self._buckets = dict()  # (shift, index) -> count
+        self.count = 0
+        self.total = 0.0  # Sum of latencies
+        self.max = 0.0
+
+    def record(self, latency):
+        """Add a latency in seconds."""
+        units = max(int(latency / UNIT), 0)
+        # Only the SUB_BITS first bits of a value are kept
+        shift = max(units.bit_length() - SUB_BITS, 0)
+        bucket = (shift, units >> shift)
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def get_percentile(self, percentile):
+        """Return the latency at 'percentile' (0 to 100),
+        None if nothing is recorded.
+        """
+        if not self.count:
+            return None
+
+        rank = max(math.ceil(percentile / 100 * self.count), 1)
+        seen = 0
+        for shift, index in sorted(self._buckets):
+            seen += self._buckets[(shift, index)]
+            if seen >= rank:
+                # Highest latency of bucket
+                break
+
+        return min((((index + 1) << shift) - 1) * UNIT, self.max)
+
+    def get_summary(self):
+        """Return count, mean, p50, p95, p99 and max of latencies."""
+        summary = {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None
+        }
+        for percentile in PERCENTILES:
+            summary['p{}'.format(percentile)] = \
+                self.get_percentile(percentile)
+        summary['max'] = self.max if self.count else None
+
+        return summary
+
+
+class Metrics():
+    """Counters and latency histograms by name, shared by threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = dict()  # name -> count
+        self._histograms = dict()  # name -> Histogram
+
+    def incr(self, name, count=1):
+        """Add 'count' to counter 'name'."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + count
+
+    def record(self, name, latency):
+        """Add a latency in seconds to histogram 'name'."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.record(latency)
+
+    @contextmanager
+    def time(self, name):
+        """Record the latency of a block in histogram 'name'."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start_time)
+
+    def get_sum(self, name):
+        """Return (count, sum) of latencies of histogram 'name'."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                return (0, 0.0)
+            return (histogram.count, histogram.total)
+
+    def snapshot(self, reset=False):
+        """Return a copy of counters and summaries of histograms.
+
+        *[reset] -- If True, restart from zero after the copy
+
+        """
+        with self._lock:
+            snapshot = {
+                'counters': dict(self._counters),
+                'latencies': {
+                    name: histogram.get_summary()
+                    for name, histogram in self._histograms.items()
+                }
+            }
+            if reset:
+                self._counters = dict()
+                self._histograms = dict()
+
+        return snapshot
+
+    def reset(self):
+        """Restart all counters and histograms from zero."""
+        with self._lock:
+            self._counters = dict()
+            self._histograms = dict()
@@ -1,46 +1,92 @@
-# version : 1.0.0
+# version : 1.1.0
 
+import json
 import os
+import sqlite3
 from tinydb import TinyDB
+from tinydb.table import Document
 
 import settings
 
 
-class Table(TinyDB):
-    """This class simplify using of TinyBD."""
+def get_table_path(table_name, engine=None):
+    """Return the database filename of a table.
 
-    def __init__(self, table_name, *args, **kwargs):
-        """Initialize TinyBD with special parametrer
-        but can be overrided.
+    *table_name : string
+    *[engine] : string : Name of storage engine, see ENGINES
 
-        *table_name : string
+    """
+    extension = get_engine(engine).EXTENSION
+    if not table_name.endswith(extension):
+        # Extension of data file is not
+        table_name = '{0}{1}'.format(table_name, extension)
 
-        """
+    return os.path.join(
+        settings.PROJECT_PATH,
+        settings.DATABASE_PATH,
+        table_name
+    )
 
-        if not table_name.endswith('.json'):
-            # Extension of data file is not
-            table_name = '{0}.json'.format(table_name)
 
-        self._path = os.path.join(
-            settings.PROJECT_PATH,
-            settings.DATABASE_PATH,
-            table_name
-        )
-        # Setting not configured arguments
-        kwargs['path'] = self._path
-        kwargs['sort_keys'] = kwargs['sort_keys'] if 'sort_keys' in kwargs else True
-        kwargs['indent'] = kwargs['indent'] if 'indent' in kwargs else 4
-        kwargs['separators'] = kwargs['separators'] if 'separators' in kwargs else (',', ': ')
-        kwargs['encoding'] = kwargs['encoding'] if 'encoding' in kwargs else 'utf-8'
-        kwargs['ensure_ascii'] = kwargs['ensure_ascii'] if 'ensure_ascii' in kwargs else False
+def get_engine(engine=None):
+    """Return the table class of a storage engine.
 
-        super().__init__(*args, **kwargs)
+    *[engine] : string : Name of engine, by default DATABASE_ENGINE
+
+    """
+    engine = engine or settings.DATABASE_ENGINE
+    if engine not in ENGINES:
+        raise KeyError("unknown storage engine '{}'".format(engine))
+
+    return ENGINES[engine]
+
+
+def open_table(table_name, engine=None):
+    """Create or open a table with the asked storage engine.
+
+    *table_name : string
+    *[engine] : string : Name of engine, by default DATABASE_ENGINE
+
+    """
+    return get_engine(engine)(table_name=table_name)
+
+
+class BaseTable():
+    """Interface shared by tables of all storage engines.
+
+    An engine provides, with the same behaviour than TinyDB:
+    *insert(document) -- Return the id of the new document
+    *insert_multiple(documents) -- Return ids of new documents
+    *search(cond) -- Return matching documents
+    *update(fields, cond=None, doc_ids=None)
+    *update_many(updates) -- Update documents with their own fields
+    *write_batch(inserts, updates) -- Insert and update in one write
+    *upsert(document, cond)
+    *remove(cond=None, doc_ids=None)
+    *all() -- Return all documents
+    *truncate() -- Remove all documents
+    *close()
+    *__len__()
+
+    """
+
+    EXTENSION = None
 
     def get_table_path(self):
         """Return the database filename."""
 
         return self._path
 
+    def get_size(self):
+        """Return the size used by the table in bytes."""
+
+        return os.path.getsize(self._path)
+
+    def estimate_size(self, doc_id, document):
+        """Return the estimated size in bytes used by a document."""
+
+        return len(json.dumps(document, ensure_ascii=False).encode('utf-8'))
+
     def insert_obj(self, obj):
         """Add an object to table."""
 
@@ -74,3 +120,312 @@ class Table(TinyDB):
                 filtred_data += (row[label],)
             result.append(filtred_data)
         return result
+
+
+class Table(BaseTable, TinyDB):
+    """This class simplify using of TinyBD.
+    (JSON storage engine, the whole file is rewritten on each write)
+    """
+
+    EXTENSION = '.json'
+
+    def __init__(self, table_name, *args, **kwargs):
+        """Initialize TinyBD with special parametrer
+        but can be overrided.
+
+        *table_name : string
+
+        """
+        self._path = get_table_path(table_name, 'json')
+        # Setting not configured arguments
+        kwargs['path'] = self._path
+        kwargs['sort_keys'] = kwargs['sort_keys'] if 'sort_keys' in kwargs else True
+        kwargs['indent'] = kwargs['indent'] if 'indent' in kwargs else 4
+        kwargs['separators'] = kwargs['separators'] if 'separators' in kwargs else (',', ': ')
+        kwargs['encoding'] = kwargs['encoding'] if 'encoding' in kwargs else 'utf-8'
+        kwargs['ensure_ascii'] = kwargs['ensure_ascii'] if 'ensure_ascii' in kwargs else False
+
+        super().__init__(*args, **kwargs)
+
+    def estimate_size(self, doc_id, document):
+        """Return the estimated size in bytes used by a document,
+        as it is written (indented in the table of the file).
+        """
+        text = json.dumps(
+            document,
+            sort_keys=True,
+            indent=4,
+            separators=(',', ': '),
+            ensure_ascii=False
+        )
+        # Each line is indented twice more in the file
+        indent = 8 * (text.count('\n') + 1)
+        # Key of the document, separator and end of line
+        key = len(str(doc_id)) + 6
+
+        return len(text.encode('utf-8')) + indent + key
+
+    def update_many(self, updates: dict):
+        """Update several documents with their own fields in one write.
+
+        *updates : dict : document id -> fields to update
+
+        """
+        self.write_batch(updates=updates)
+
+    def write_batch(self, inserts: list = (), updates: dict = None):
+        """Insert and update documents in one write,
+        return ids of inserted documents.
+
+        *[inserts] : list : documents to insert
+        *[updates] : dict : document id -> fields to update
+
+        """
+        table = self.table(self.default_table_name)
+        doc_ids = list()
+
+        def updater(docs):
+            for doc_id, fields in (updates or {}).items():
+                docs[doc_id].update(fields)
+            for document in inserts:
+                doc_id = table._get_next_id()
+                doc_ids.append(doc_id)
+                docs[doc_id] = dict(document)
+
+        # Same single read and write than TinyDB insert_multiple
+        table._update_table(updater)
+
+        return doc_ids
+
+
+class SQLiteTable(BaseTable):
+    """Table saved in a SQLite database, each document is a row.
+    (SQLite storage engine, only written rows are saved)
+    """
+
+    EXTENSION = '.sqlite3'
+    # Fields of document copied in their own indexed column, used by
+    # search to select rows (clocks change too often to be indexed)
+    COLUMNS = ('label', 'lem', 'type')
+
+    def __init__(self, table_name):
+        """Create or open the SQLite database.
+
+        *table_name : string
+
+        """
+        self._path = get_table_path(table_name, 'sqlite')
+        self._connection = sqlite3.connect(
+            self._path,
+            check_same_thread=False
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS documents ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'label TEXT, lem TEXT, type TEXT, '
+                'document TEXT NOT NULL)'
+            )
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS documents_label '
+                'ON documents (label, type)'
+            )
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS documents_lem '
+                'ON documents (lem)'
+            )
+
+    def __len__(self):
+        return self._connection.execute(
+            'SELECT COUNT(*) FROM documents'
+        ).fetchone()[0]
+
+    def get_size(self):
+        """Return the size used by the table in bytes,
+        free pages of the file are not counted.
+        """
+        page_size, = self._connection.execute('PRAGMA page_size').fetchone()
+        pages, = self._connection.execute('PRAGMA page_count').fetchone()
+        free, = self._connection.execute('PRAGMA freelist_count').fetchone()
+
+        return (pages - free) * page_size
+
+    def insert(self, document):
+        with self._connection:
+            return self._insert(document)
+
+    def insert_multiple(self, documents):
+        with self._connection:
+            return [self._insert(document) for document in documents]
+
+    def search(self, cond):
+        """Return documents matching 'cond', only rows with the values
+        of indexed columns tested by 'cond' are read.
+        """
+        where, params = self._where(getattr(cond, '_hash', None))
+
+        return [
+            doc for doc in (
+                Document(json.loads(document), doc_id)
+                for doc_id, document in self._connection.execute(
+                    'SELECT id, document FROM documents{} ORDER BY id'
+                    .format(where),
+                    params
+                )
+            ) if cond(doc)
+        ]
+
+    def update(self, fields, cond=None, doc_ids=None):
+        if doc_ids is not None:
+            docs = [self._get(doc_id) for doc_id in doc_ids]
+        elif cond is not None:
+            docs = self.search(cond)
+        else:
+            docs = self.all()
+
+        with self._connection:
+            for doc in docs:
+                if callable(fields):
+                    fields(doc)
+                else:
+                    doc.update(fields)
+                self._write(doc)
+
+        return [doc.doc_id for doc in docs]
+
+    def update_many(self, updates: dict):
+        """Update several documents with their own fields in one write.
+
+        *updates : dict : document id -> fields to update
+
+        """
+        self.write_batch(updates=updates)
+
+    def write_batch(self, inserts: list = (), updates: dict = None):
+        """Insert and update documents in one transaction,
+        return ids of inserted documents.
+
+        *[inserts] : list : documents to insert
+        *[updates] : dict : document id -> fields to update
+
+        """
+        with self._connection:
+            for doc_id, fields in (updates or {}).items():
+                doc = self._get(doc_id)
+                doc.update(fields)
+                self._write(doc)
+
+            return [self._insert(document) for document in inserts]
+
+    def upsert(self, document, cond):
+        updated_ids = self.update(document, cond)
+        if updated_ids:
+            return updated_ids
+
+        return [self.insert(document)]
+
+    def remove(self, cond=None, doc_ids=None):
+        if doc_ids is not None:
+            removed_ids = list(doc_ids)
+        elif cond is not None:
+            removed_ids = [doc.doc_id for doc in self.search(cond)]
+        else:
+            raise RuntimeError('Use truncate() to remove all documents')
+
+        with self._connection:
+            self._connection.executemany(
+                'DELETE FROM documents WHERE id = ?',
+                [(doc_id, ) for doc_id in removed_ids]
+            )
+
+        return removed_ids
+
+    def all(self):
+        return [
+            Document(json.loads(document), doc_id)
+            for doc_id, document in self._connection.execute(
+                'SELECT id, document FROM documents ORDER BY id'
+            )
+        ]
+
+    def truncate(self):
+        with self._connection:
+            self._connection.execute('DELETE FROM documents')
+
+    def close(self):
+        self._connection.close()
+
+    def _get(self, doc_id):
+        """Return the document of 'doc_id'."""
+        row = self._connection.execute(
+            'SELECT document FROM documents WHERE id = ?',
+            (doc_id, )
+        ).fetchone()
+        if row is None:
+            raise KeyError(doc_id)
+
+        return Document(json.loads(row[0]), doc_id)
+
+    def _insert(self, document):
+        """Insert a row without committing and return its id."""
+        cursor = self._connection.execute(
+            'INSERT INTO documents (label, lem, type, document) '
+            'VALUES (?, ?, ?, ?)',
+            self._columns(document) + (self._dumps(document), )
+        )
+
+        return cursor.lastrowid
+
+    def _write(self, doc):
+        """Save a modified document without committing."""
+        self._connection.execute(
+            'UPDATE documents SET label = ?, lem = ?, type = ?, '
+            'document = ? WHERE id = ?',
+            self._columns(doc) + (self._dumps(doc), doc.doc_id)
+        )
+
+    def _where(self, query_hash):
+        """Return the SQL clause and parameters selecting rows from
+        equalities of indexed columns in a TinyDB query (see
+        Query._hash), an empty clause if it tests none of them.
+        """
+        if not query_hash:
+            return '', ()
+
+        # Equalities of a query or of a conjunction of queries
+        tests = query_hash[1] if query_hash[0] == 'and' else [query_hash]
+        clauses, params = list(), tuple()
+        for test in tests:
+            if isinstance(test, tuple) and len(test) == 3 and \
+                    test[0] == '==' and len(test[1]) == 1 and \
+                    test[1][0] in self.COLUMNS and isinstance(test[2], str):
+                clauses.append('{} = ?'.format(test[1][0]))
+                params += (test[2], )
+        if not clauses:
+            return '', ()
+
+        return ' WHERE ' + ' AND '.join(clauses), params
+
+    def _columns(self, document):
+        """Return values of indexed columns of 'document'."""
+        values = tuple()
+        for column in self.COLUMNS:
+            value = document.get(column)
+            if not isinstance(value, (str, int, float)):
+                # Cannot be indexed
+                value = None
+            values += (value, )
+        return values
+
+    def _dumps(self, document):
+        """Serialize 'document' to be saved."""
+        return json.dumps(dict(document), ensure_ascii=False)
+
+
+# Storage engines by name
+ENGINES = {
+    'json': Table,
+    'sqlite': SQLiteTable
+}
@@ -53,11 +53,48 @@ CODES['flexional'] = {
     }
 
 
+# Label of each code, the first section defining a code wins
+LABELS = dict()
+for _codes in reversed(list(CODES.values())):
+    LABELS.update(_codes)
+
+
 def get_code_of(tag):
     """Return code that matching with tag"""
 
-    for section, codes in CODES.items():
-        if tag in codes:
-            return codes[tag]
+    return LABELS.get(tag)
+
+
+def _get_bits_of(section):
+    """Return a bit for each code and label of section"""
+
+    bits = dict()
+    for i, (code, label) in enumerate(CODES[section].items()):
+        bits[code] = bits[label] = 1 << i
+
+    return bits
+
+
+# Bit of each code and label for sections saved in lists
+BITS = {
+    'flexional': _get_bits_of('flexional'),
+    'semantic': _get_bits_of('semantic')
+}
+
+
+def get_mask_of(section, values):
+    """Return the bitmask of values (codes or labels, or lists of them)
+    and the list of values unknown in section
+    """
+
+    bits = BITS[section]
+    mask = 0
+    unknown = list()
+    for value in values:
+        for tag in (value if isinstance(value, list) else [value]):
+            if tag in bits:
+                mask |= bits[tag]
+            else:
+                unknown.append(tag)
 
-    return None
+    return mask, unknown
@@ -0,0 +1,310 @@
+"""HTTP transport to the API Dictionary.
+
+A single requests session is shared by all Dictionary instances of the
+process, so that its pool keeps TCP connections alive between requests
+(one round-trip by request instead of a new connection for each word).
+Requests are run by a pool of threads (see submit), so that waiting an
+answer never blocks the caller or its event loop, and identical requests
+running at the same time share one call to the API. Coroutines of all
+threads are run by one event loop (see get_loop).
+
+Each endpoint has a circuit breaker (see get_breaker): while the API
+fails, its requests raise CircuitOpenError at once instead of waiting
+timeouts, and the read timeout follows latencies seen of the endpoint.
+
+requests and asyncio are only imported when they are first needed.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import deepcopy
+from functools import partial
+from urllib.parse import quote, urlencode
+import threading
+import time
+
+from .breaker import CircuitBreaker
+import settings
+
+HEADERS = {'Content-Type': 'application/json'}
+
+_session = None
+_session_lock = threading.Lock()
+_executor = None
+_loop = None
+# Running requests (see get_key -> concurrent.futures.Future)
+_flights = dict()
+_flights_lock = threading.RLock()
+# Endpoint (see get_endpoint) -> CircuitBreaker
+_breakers = dict()
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(OSError):
+    """Request not sent because circuit of its endpoint is open."""
+
+
+def get_session():
+    """Return the session shared by the process, created on first call
+    with DICTIONARY_API_POOL_SIZE connections by host and a retry policy
+    of DICTIONARY_API_RETRIES attempts.
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            # Slow to import, not needed before the first request
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=settings.DICTIONARY_API_RETRIES,
+                # A timeout caps the whole request, a server that cannot
+                # be reached or is slow is not requested again
+                connect=0,
+                read=0,
+                backoff_factor=settings.DICTIONARY_API_BACKOFF,
+                status_forcelist=(502, 503, 504),
+                # Only the backoff is waited, whatever the server asks
+                respect_retry_after_header=False
+            )
+            adapter = HTTPAdapter(
+                pool_connections=settings.DICTIONARY_API_POOL_SIZE,
+                pool_maxsize=settings.DICTIONARY_API_POOL_SIZE,
+                max_retries=retry
+            )
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+
+        return _session
+
+
+def close_session():
+    """Close connections of the shared session."""
+    global _session
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_executor():
+    """Return the pool of threads running requests of the process,
+    one thread by connection of the session.
+    """
+    global _executor
+
+    with _session_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.DICTIONARY_API_POOL_SIZE,
+                thread_name_prefix='dictionary-api'
+            )
+
+        return _executor
+
+
+def get_loop():
+    """Return the event loop of the process, run forever by its own
+    thread. Use run_threadsafe to run a coroutine on it from any thread.
+    """
+    global _loop
+
+    with _session_lock:
+        if _loop is None:
+            import asyncio
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                name='dictionary-io',
+                target=_loop.run_forever,
+                daemon=True
+            ).start()
+
+        return _loop
+
+
+def run_threadsafe(coroutine):
+    """Run 'coroutine' on the event loop of the process and return
+    a concurrent.futures.Future of its result.
+    """
+    import asyncio
+
+    return asyncio.run_coroutine_threadsafe(coroutine, get_loop())
+
+
+async def wait(future):
+    """Wait a concurrent.futures.Future (see submit) without blocking
+    the event loop and return its result.
+    """
+    import asyncio
+
+    return await asyncio.wrap_future(future)
+
+
+def get_timeout(timeout=None):
+    """Return (connect, read) timeout of a request, 'timeout' replace
+    both if it is given.
+    """
+    if timeout is not None:
+        return timeout
+
+    return (
+        settings.DICTIONARY_API_CONNECT_TIMEOUT,
+        settings.DICTIONARY_API_READ_TIMEOUT
+    )
+
+
+def build_url(*args, **kwargs):
+    """Return URL of API for path 'args' and query 'kwargs',
+    a list is sent as a repeated parameter and None values are skipped.
+
+    ex: build_url('unitex', 'compose', lem='être', flexional=['P', '3'])
+    """
+    params = list()
+    for key, arg in kwargs.items():
+        for elem in (arg if isinstance(arg, (list, tuple)) else [arg]):
+            if elem is None:
+                continue
+            if isinstance(elem, str):
+                elem = elem.strip()
+            params.append((key, elem))
+
+    url = '{}/{}'.format(
+        settings.DICTIONARY_API_URL,
+        '/'.join(quote(str(arg).strip(), safe='') for arg in args)
+    )
+    if params:
+        url = '{}?{}'.format(url, urlencode(params))
+
+    return url
+
+
+def get_endpoint(*args):
+    """Return the endpoint of a request path, its first part
+    ('unitex/compose' for composition).
+    """
+    if tuple(args[1:2]) == ('compose',):
+        return '/'.join(args[:2])
+
+    return str(args[0])
+
+
+def get_breaker(endpoint):
+    """Return the circuit breaker of 'endpoint', created on first call."""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker()
+
+        return breaker
+
+
+def reset_breakers():
+    """Forget state of all circuit breakers."""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def get_key(*args, **kwargs):
+    """Return the key of a request, same arguments in any order
+    give the same key.
+    """
+    return build_url(*args, **dict(sorted(kwargs.items())))
+
+
+def get(*args, _timeout=None, **kwargs):
+    """Request API with the shared session and return the decoded
+    JSON answer, None if API answer with an error.
+
+    Raise requests.exceptions.RequestException (an OSError) if API
+    cannot be reached, CircuitOpenError if the circuit of the endpoint
+    is open.
+    """
+    endpoint = get_endpoint(*args)
+    breaker = get_breaker(endpoint)
+    if not breaker.allow():
+        raise CircuitOpenError('Circuit of {} is open'.format(endpoint))
+
+    if _timeout is None:
+        _timeout = (
+            settings.DICTIONARY_API_CONNECT_TIMEOUT,
+            breaker.get_timeout(settings.DICTIONARY_API_READ_TIMEOUT)
+        )
+
+    start_time = time.monotonic()
+    try:
+        response = get_session().get(
+            build_url(*args, **kwargs),
+            timeout=get_timeout(_timeout)
+        )
+    except Exception as error:
+        breaker.record(
+            False,
+            time.monotonic() - start_time,
+            timed_out=_is_timeout(error)
+        )
+        raise
+    # A client error (unknown word...) is an answer of a working server
+    breaker.record(
+        response.status_code < 500,
+        time.monotonic() - start_time
+    )
+    if response.status_code != 200:
+        return None
+
+    return response.json()
+
+
+def _is_timeout(error):
+    """Return if 'error' raised by a request is a timeout, requests
+    gives a ConnectionError when it ends the retries of urllib3.
+    """
+    from requests.exceptions import Timeout
+    from urllib3.exceptions import TimeoutError
+
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, Timeout) or isinstance(reason, TimeoutError)
+
+
+def submit(*args, _timeout=None, **kwargs):
+    """Start a request (see get) in the pool of threads and return its
+    concurrent.futures.Future, use wait to await it.
+
+    If the same request is already running, it is not sent again and
+    each caller gets its own copy of the shared result.
+    """
+    key = get_key(*args, **kwargs)
+    with _flights_lock:
+        flight = _flights.get(key)
+        if flight is None:
+            flight = get_executor().submit(
+                get,
+                *args,
+                _timeout=_timeout,
+                **kwargs
+            )
+            _flights[key] = flight
+            flight.add_done_callback(partial(_land, key))
+
+    future = Future()
+    flight.add_done_callback(partial(_copy_result, future))
+
+    return future
+
+
+def _land(key, flight):
+    """Remove an ended request from running requests."""
+    with _flights_lock:
+        if _flights.get(key) is flight:
+            del _flights[key]
+
+
+def _copy_result(future, flight):
+    """Give to 'future' a copy of the result of a shared request."""
+    if flight.exception() is not None:
+        future.set_exception(flight.exception())
+    else:
+        future.set_result(deepcopy(flight.result()))
@@ -8,9 +8,18 @@ PROJECT_PATH = os.path.dirname(os.path.abspath(__file__))
 
 # Database variables
 DATABASE_PATH = 'datas'
+DATABASE_ENGINE = 'json'  # Storage engine of tables ('json' or 'sqlite')
 LOCAL_DICT_MAX_SIZE = 5 * (1024 * 1024)  # 5 Mb
 LOCAL_DICT_MIN_COUNT = 1000  # 100 elements
 LOCAL_DICT_CLEAN_COEF = (2 / 3)
+LOCAL_DICT_CLOCK_FLUSH_COUNT = 100  # Clocks waiting before a save
+LOCAL_DICT_CLOCK_FLUSH_DELAY = 5  # Seconds before saving waiting clocks
+LOCAL_DICT_LEXICON = None  # Path of a compiled read-only lexicon
+LOCAL_DICT_CACHE_TTL = 7 * 24 * 3600  # Seconds before refetching a word
+LOCAL_DICT_NEGATIVE_TTL = 3600  # Seconds before refetching a missing word
+LOCAL_DICT_MAX_QUERIES = 10000  # Remote answers kept in memory
+LOCAL_DICT_WARM_PATH = None  # Frequency list fetched when opening
+LOCAL_DICT_WARM_COUNT = 5000  # Most frequent labels fetched by warm
 
 # API Dictionary variables
 DICTIONARY_API_HOST = '25.0.35.218'
@@ -19,3 +28,17 @@ DICTIONARY_API_URL = 'http://{}:{}'.format(
     DICTIONARY_API_HOST,
     DICTIONARY_API_PORT
 )
+DICTIONARY_API_POOL_SIZE = 10  # Kept-alive connections
+DICTIONARY_API_CONNECT_TIMEOUT = 1  # Seconds
+DICTIONARY_API_READ_TIMEOUT = 5  # Seconds
+DICTIONARY_API_RETRIES = 2  # Attempts after a 502, 503 or 504 answer
+DICTIONARY_API_BACKOFF = 0.1  # Seconds, doubled after each retry
+DICTIONARY_API_WARM_RATE = 50  # Max requests by second of warm
+# Circuit breaker of each endpoint (see dictionary/breaker.py)
+DICTIONARY_API_BREAKER_WINDOW = 50  # Last requests kept
+DICTIONARY_API_BREAKER_ERROR_RATE = 0.5  # Rate of errors opening circuit
+DICTIONARY_API_BREAKER_MIN_CALLS = 5  # Requests before computing rates
+DICTIONARY_API_BREAKER_DELAY = 1  # Seconds open, doubled by failed trial
+DICTIONARY_API_BREAKER_MAX_DELAY = 60  # Seconds
+DICTIONARY_API_TIMEOUT_FACTOR = 2  # Read timeout is p99 latency * factor
+DICTIONARY_API_MIN_TIMEOUT = 0.05  # Seconds
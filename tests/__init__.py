@@ -1,2 +1,11 @@
 from .test_dictionary import DictionaryTest
 from .test_local_dictionary import LocalDictionaryTest
+from .test_local_dictionary import SQLiteLocalDictionaryTest
+from .test_storage import StorageTest, SQLiteStorageTest
+from .test_codec import CodecTest
+from .test_importer import ImporterTest
+from .test_lexicon import LexiconTest
+from .test_transport import TransportTest
+from .test_locks import RWLockTest
+from .test_breaker import CircuitBreakerTest
+from .test_metrics import MetricsTest
@@ -0,0 +1,98 @@
+import time
+import unittest
+
+from dictionary import breaker
+from dictionary.breaker import CircuitBreaker
+import settings
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    """Test case used for test the circuit breaker of an endpoint."""
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(
+            window=10,
+            error_rate=0.5,
+            min_calls=4,
+            delay=0.05,
+            max_delay=0.2
+        )
+
+    def test_open(self):
+        """Test that errors open the circuit."""
+        for i in range(3):
+            self.breaker.record(False, 0.01)
+            self.assertEqual(self.breaker.get_state(), breaker.CLOSED)
+        self.breaker.record(False, 0.01)
+
+        self.assertEqual(self.breaker.get_state(), breaker.OPEN)
+        self.assertFalse(self.breaker.allow(), 'Test fail fast')
+
+    def test_error_rate(self):
+        """Test that a few errors keep the circuit closed."""
+        for success in (True, True, True, False, True, False):
+            self.breaker.record(success, 0.01)
+
+        self.assertEqual(self.breaker.get_state(), breaker.CLOSED)
+
+    def test_half_open(self):
+        """Test that one trial is sent after the delay."""
+        for i in range(4):
+            self.breaker.record(False, 0.01)
+        time.sleep(0.06)
+
+        self.assertEqual(self.breaker.get_state(), breaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow(), 'Test trial request')
+        self.assertFalse(self.breaker.allow(), 'Test only one trial')
+
+        # Failed trial opens circuit for a longer delay
+        self.breaker.record(False, 0.01)
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.get_state(), breaker.OPEN)
+        time.sleep(0.05)
+
+        # Successful trial closes circuit
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(True, 0.01)
+        self.assertEqual(self.breaker.get_state(), breaker.CLOSED)
+
+    def test_timeout(self):
+        """Test the read timeout derived from latencies."""
+        self.assertEqual(self.breaker.get_timeout(5), 5)
+
+        for latency in (0.1, 0.2, 0.1, 0.3):
+            self.breaker.record(True, latency)
+
+        self.assertEqual(self.breaker.get_latency(99), 0.3)
+        self.assertAlmostEqual(
+            self.breaker.get_timeout(5),
+            0.3 * settings.DICTIONARY_API_TIMEOUT_FACTOR
+        )
+        self.assertEqual(self.breaker.get_timeout(0.1), 0.1, 'Test max')
+
+    def test_slower_server(self):
+        """Test that a timeout does not stay too short for a server
+        become slower.
+        """
+        for i in range(4):
+            self.breaker.record(True, 0.01)
+        timeout = self.breaker.get_timeout(5)
+        self.assertEqual(timeout, settings.DICTIONARY_API_MIN_TIMEOUT)
+
+        # Next request after a timeout can wait the slower answer
+        self.breaker.record(False, timeout, timed_out=True)
+        self.assertEqual(self.breaker.get_timeout(5), 5)
+        self.breaker.record(True, 0.15)
+        self.assertAlmostEqual(
+            self.breaker.get_timeout(5),
+            0.15 * settings.DICTIONARY_API_TIMEOUT_FACTOR
+        )
+
+        # Trial request after the circuit opened
+        for i in range(10):
+            self.breaker.record(False, timeout, timed_out=True)
+            self.breaker.record(True, 0.01)
+        self.breaker.record(False, 0.01)
+        time.sleep(0.06)
+        self.assertTrue(self.breaker.allow(), 'Test trial request')
+        self.assertEqual(self.breaker.get_timeout(5), 5)
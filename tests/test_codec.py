@@ -0,0 +1,41 @@
+import unittest
+
+from dictionary import codec, tags
+
+
+class CodecTest(unittest.TestCase):
+    """Test case used for test function of module 'codec'."""
+
+    def test_decode_and_encode(self):
+        """Test conversion of codes to labels and back."""
+        self.assertEqual(codec.decode('m', 'flexional'), 'masculin')
+        self.assertEqual(codec.encode('masculin'), 'm')
+        self.assertEqual(codec.decode('V'), tags.get_code_of('V'))
+        self.assertTrue(codec.decode('unknown') is None)
+
+        self.assertEqual(
+            codec.encode_many(['verbe', 'langage courant', 'unknown']),
+            ['V', 'z1', None]
+        )
+        self.assertEqual(
+            codec.decode_many(['s', 'p'], 'flexional'),
+            ['singulier', 'pluriel']
+        )
+
+    def test_parse_tag(self):
+        """Test parsing of a DELA tag string."""
+        self.assertEqual(
+            codec.parse_tag('V+z1:W:Kms'),
+            ('V', ('z1', ), (('W', ), ('K', 'm', 's')))
+        )
+
+        word = codec.decode_tag('N+z1+Hum:ms')
+        self.assertEqual(word['type'], 'nom')
+        self.assertEqual(word['semantic'], ['langage courant', 'humain'])
+        self.assertEqual(word['flexional'], [['masculin', 'singulier']])
+
+    def test_encode_tag(self):
+        """Test if a decoded tag is encoded back."""
+        tag = 'V+z1+t:P1s:P3s'
+
+        self.assertEqual(codec.encode_tag(**codec.decode_tag(tag)), tag)
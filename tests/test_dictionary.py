@@ -1,7 +1,17 @@
+from concurrent.futures import Future
+from contextlib import contextmanager, suppress
+from copy import deepcopy
+from unittest import mock
+import threading
+import time
 import unittest
 import os
 
-from dictionary import Dictionary
+from dictionary import Dictionary, transport
+import settings
+
+# Answer of API for 'chat'
+CHAT = [{'label': 'chat', 'lem': 'chat', 'gram': 'nom'}]
 
 
 class DictionaryTest(unittest.TestCase):
@@ -20,9 +30,36 @@ class DictionaryTest(unittest.TestCase):
         self.dictionary._local_db.close()
         del self.dictionary
 
-        if self.name:
+        if self.name and os.path.exists(path):
+            # Database is only created on first use
             os.remove(path)
 
+    @contextmanager
+    def fake_api(self, endpoint, answers, connected=True):
+        """Replace requests to 'endpoint' of API by 'answers' (label ->
+        results, or exception to raise), other labels have no result.
+        API is always reachable if 'connected', labels of requests are
+        given.
+        """
+        calls = list()
+
+        def get(*args, _timeout=None, **kwargs):
+            if args[0] != endpoint:
+                # Ping of server
+                return None
+            calls.append(args[1])
+            answer = answers.get(args[1], [])
+            if isinstance(answer, Exception):
+                raise answer
+            return deepcopy(answer)
+
+        is_connected = mock.patch.object(
+            self.dictionary, '_is_connected', return_value=True
+        )
+        with mock.patch.object(transport, 'get', get), \
+                (is_connected if connected else suppress()):
+            yield calls
+
     def test_init_dictionary(self):
         """Test if dictionary is correctly instanciate."""
         self.assertTrue(self.dictionary is not None)
@@ -41,6 +78,213 @@ class DictionaryTest(unittest.TestCase):
 
         self.assertTrue(label in self.dictionary, 'Test to find word')
 
+    def test_insert_many_words(self):
+        """Test to insert several words in database."""
+        words = self.dictionary.insert_many([
+            {'label': 'test', 'type': 'nom'},
+            {'label': 'tester', 'type': 'verbe'}
+        ])
+
+        self.assertEqual(len(words), 2, 'Test count of inserted words')
+        self.assertTrue('tester' in self.dictionary, 'Test to find word')
+
+    def test_find_misspelled_word(self):
+        """Test to find a misspelled word with fuzzy option."""
+        self.dictionary.insert(label='dictionnaire', type='nom')
+
+        self.assertEqual(
+            self.dictionary.suggest('dictionaire'),
+            ['dictionnaire']
+        )
+        results = self.dictionary.find('dictionaire', fuzzy=True)
+        self.assertTrue(
+            results and results[0]['label'] == 'dictionnaire',
+            'Test if nearest word is found'
+        )
+
+    def test_find_without_accents(self):
+        """Test to find words without their accents and case."""
+        self.dictionary.insert_many([
+            {'label': 'être', 'type': 'verbe', 'lem': 'être'},
+            {'label': 'été', 'type': 'verbe', 'lem': 'être'}
+        ])
+
+        results = self.dictionary.find('ETRE', accent_insensitive=True)
+        self.assertTrue(
+            results and results[0]['label'] == 'être',
+            'Test if word is found without accents'
+        )
+        self.assertTrue(
+            self.dictionary.contains('Ete', accent_insensitive=True)
+        )
+        self.assertFalse('Ete' in self.dictionary)
+        self.assertEqual(
+            len(self.dictionary.compose('etre', accent_insensitive=True)), 2
+        )
+
+    def test_cache_remote_words(self):
+        """Test that API answers are saved in local database."""
+        with self.fake_api('unitex', {'chat': CHAT}) as calls:
+            results = self.dictionary.find('chat')
+            self.assertEqual(len(results), 1, 'Test remote word')
+            self.assertTrue(results[0]['isPersistent'])
+            self.assertIsNone(self.dictionary.find('chien'))
+            # Answers are now read from local database
+            self.assertEqual(len(self.dictionary.find('chat', all=True)), 1)
+            self.assertIsNone(self.dictionary.find('chien'))
+            self.assertEqual(len(calls), 2, 'Test count of requests')
+            # Too old words are requested again
+            self.dictionary.update({'fetchedAt': 0}, results[0])
+            self.assertEqual(len(self.dictionary.find('chat')), 1)
+            self.assertEqual(len(calls), 3, 'Test count of requests')
+
+    def test_probe_waited(self):
+        """Test that a first search waits the server probe, at most the
+        connection timeout.
+        """
+        def probe_server():
+            time.sleep(0.05)
+            Dictionary.server_infos['connected'] = True
+
+        event = threading.Event()
+        probe, server_infos = Dictionary._probe, Dictionary.server_infos
+        try:
+            Dictionary.server_infos = dict(Dictionary.server_state_model)
+            Dictionary._probe = threading.Thread(target=probe_server)
+            Dictionary._probe.start()
+            with self.fake_api('unitex', {'chat': CHAT}, connected=False) \
+                    as calls:
+                results = self.dictionary.find('chat')
+            self.assertEqual(calls, ['chat'], 'Test if API is requested')
+            self.assertEqual(len(results), 1, 'Test remote word')
+
+            # Probe of a server that does not answer
+            Dictionary.server_infos = dict(Dictionary.server_state_model)
+            Dictionary._probe = threading.Thread(target=event.wait)
+            Dictionary._probe.start()
+            with mock.patch.object(settings,
+                                   'DICTIONARY_API_CONNECT_TIMEOUT', 0.1):
+                start_time = time.time()
+                self.assertFalse(self.dictionary._is_connected())
+                self.assertLess(time.time() - start_time, 0.5)
+        finally:
+            event.set()
+            Dictionary._probe, Dictionary.server_infos = probe, server_infos
+
+    def test_find_time_opti(self):
+        """Test that max time of local finds follows remote searches."""
+        ping = Future()
+        ping.set_result(time.time())
+        connected = Dictionary.server_infos['connected']
+        transport.reset_breakers()
+        try:
+            self.dictionary._pinged(ping)
+            self.assertIsNone(
+                self.dictionary._local_db.find_time_opti,
+                'Test that ping latency is not used'
+            )
+
+            for latency in (0.02, 0.03, 0.04):
+                transport.get_breaker('unitex').record(True, latency)
+            self.dictionary._pinged(ping)
+            self.assertEqual(self.dictionary._local_db.find_time_opti, 0.03)
+        finally:
+            transport.reset_breakers()
+            Dictionary.server_infos['connected'] = connected
+
+    def test_warm(self):
+        """Test to fetch words of a frequency list in background."""
+        path = os.path.join(settings.PROJECT_PATH, 'frequency-test.txt')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('chat\t120\nchien\t80\ninconnu\t20\nrare\t1\n')
+        self.dictionary.insert(label='chien', type='nom')
+        progress = list()
+        try:
+            with self.fake_api('unitex', {'chat': CHAT}) as calls:
+                stats = self.dictionary.warm(
+                    path,
+                    concurrency=2,
+                    limit=3,
+                    progress=progress.append
+                ).result(timeout=5)
+                # Warm words are read from local database
+                self.assertEqual(len(self.dictionary.find('chat')), 1)
+                self.assertIsNone(self.dictionary.find('inconnu'))
+        finally:
+            os.remove(path)
+
+        self.assertEqual(sorted(calls), ['chat', 'inconnu'])
+        self.assertEqual(
+            (stats['words'], stats['known'], stats['fetched'],
+             stats['missing'], stats['errors']),
+            (3, 1, 1, 1, 0)
+        )
+        self.assertEqual(progress[-1], stats, 'Test progress')
+
+    def test_get_infos_on_many(self):
+        """Test to get infos on several words with concurrent requests."""
+        answers = {
+            'chat': [{'sens': ['Sens de chat']}],
+            'chien': OSError('API error'),
+            'lapin': None  # Error answer
+        }
+        for label in ('chat', 'chien', 'cheval', 'lapin'):
+            self.dictionary.insert(label=label, type='nom')
+        words = [self.dictionary.find(label)[0]
+                 for label in ('chat', 'chien', 'cheval', 'chat', 'lapin')]
+        words[2]['isFetched'] = True
+        with self.fake_api('dictionary', answers) as calls:
+            errors = self.dictionary.get_infos_on_many(words, concurrency=2)
+
+        self.assertEqual(sorted(calls), ['chat', 'chien', 'lapin'])
+        self.assertEqual(
+            [error is not None for error in errors],
+            [False, True, False, False, True],
+            'Test errors of each word'
+        )
+        self.assertIsInstance(errors[4], LookupError)
+        self.assertFalse(words[4].get('isFetched'))
+        self.assertEqual(words[0]['sens'], ['Sens de chat'])
+        self.assertTrue(words[3]['isFetched'])
+        self.assertEqual(words[1]['sens'], [])
+        # Infos are saved
+        saved = self.dictionary.find('chat')[0]
+        self.assertEqual(saved['sens'], ['Sens de chat'])
+        self.assertTrue(saved['isFetched'])
+
+    def test_stats(self):
+        """Test counters and latencies of a dictionary."""
+        with self.fake_api('unitex', {'chat': CHAT}):
+            self.dictionary.stats(reset=True)
+            self.dictionary.find('chat')
+            self.dictionary.find('chat')
+
+        stats = self.dictionary.stats(reset=True)
+        self.assertEqual(stats['counters']['hits'], 1)
+        self.assertEqual(stats['counters']['misses'], 1)
+        self.assertEqual(stats['counters']['remote_calls'], 1)
+        self.assertEqual(stats['latencies']['fetch']['count'], 1)
+        self.assertEqual(stats['latencies']['write']['count'], 1)
+        self.assertGreaterEqual(
+            stats['latencies']['find']['max'],
+            stats['latencies']['find']['p50']
+        )
+        self.assertEqual(self.dictionary.stats()['counters'], {}, 'Reset')
+
+    def test_find_many_words(self):
+        """Test to find several words with concurrent requests."""
+        self.dictionary.insert(label='chien', type='nom')
+        with self.fake_api('unitex', {'chat': CHAT}) as calls:
+            labels = ['chat', 'chien', 'inconnu', 'chat']
+            results = list(self.dictionary.find_many(labels, concurrency=2))
+
+        self.assertEqual(
+            [words and words[0]['label'] for words in results],
+            ['chat', 'chien', None, 'chat'],
+            'Test order of results'
+        )
+        self.assertEqual(sorted(calls), ['chat', 'inconnu'])
+
     def test_find_one_word(self):
         """Test to find a word in database."""
         self.dictionary.insert(label='avoir')
@@ -76,6 +320,22 @@ class DictionaryTest(unittest.TestCase):
         self.assertTrue('teste' in labels, 'Test if \'teste\' is in result')
         self.assertTrue('testes' in labels, 'Test if \'testes\' is in result')
 
+    def test_compose_word_with_type(self):
+        """Test to compose a word of a given type"""
+        self.dictionary.insert_many([
+            {'label': 'porte', 'type': 'nom', 'lem': 'porte'},
+            {'label': 'portes', 'type': 'nom', 'lem': 'porte'},
+            {'label': 'portes', 'type': 'verbe', 'lem': 'porte'}
+        ])
+
+        results = self.dictionary.compose(lem='porte', type='verbe')
+
+        self.assertEqual(
+            [(r['label'], r['type']) for r in results],
+            [('portes', 'verbe')],
+            'Test if only words of type are found'
+        )
+
     def test_update_word(self):
         """Test if update of word infos working well."""
         word = self.dictionary.insert(
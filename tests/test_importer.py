@@ -0,0 +1,91 @@
+from unittest import mock
+import unittest
+import os
+
+from dictionary import LocalDictionary
+from dictionary.importer import import_delaf, split_entry
+import settings
+
+
+class ImporterTest(unittest.TestCase):
+    """Test case used for test function of module 'importer'."""
+
+    lines = [
+        'avoir,.V+z1:W',
+        'avoir,.N+z1:ms',
+        'ai,avoir.V+z1:P1s',
+        'eu,avoir.V+z1:Kms',
+        '',
+        'a\\,b,a\\,b.N:ms/comment'
+    ]
+
+    def setUp(self):
+        """Initialization of test and write a DELAF file."""
+        self.path = os.path.join(
+            settings.PROJECT_PATH,
+            settings.DATABASE_PATH,
+            'importer-test.dic'
+        )
+        with open(self.path, 'w', encoding='utf-16') as file:
+            file.write('\n'.join(self.lines))
+        self.db = LocalDictionary(dictionary_name='importer-test')
+
+    def tearDown(self):
+        """Cleaning of resources created for tests."""
+        path = self.db.get_table_path()
+        self.db.close()
+        del self.db
+        if os.path.exists(path):
+            # Database is only created on first use
+            os.remove(path)
+        os.remove(self.path)
+
+    def test_split_entry(self):
+        """Test parsing of DELAF lines."""
+        self.assertEqual(
+            split_entry('ai,avoir.V+z1:P1s\n'),
+            ('ai', 'avoir', 'V+z1:P1s')
+        )
+        self.assertEqual(split_entry('avoir,.V'), ('avoir', 'avoir', 'V'))
+        self.assertTrue(split_entry('/ comment') is None)
+        self.assertRaises(ValueError, split_entry, 'avoir')
+
+    def test_import_delaf(self):
+        """Test to import a DELAF file by batches."""
+        progress = list()
+        stats = import_delaf(
+            self.path,
+            self.db,
+            batch_size=2,
+            progress=progress.append
+        )
+
+        self.assertEqual(stats['words'], 5, 'Test count of words')
+        self.assertEqual(len(self.db), 5, 'Test count of saved words')
+        self.assertEqual((stats['kept'], stats['evicted']), (5, 0))
+        self.assertTrue(len(progress) >= 3, 'Test progress reports')
+
+        search_word = dict(self.db.DEFAULT_MODEL)
+        search_word.update({
+            'lem': 'avoir',
+            'type': 'verbe',
+            'flexional': ['participe passé']
+        })
+        find_words = self.db.find(search_word)
+        self.assertEqual([w['label'] for w in find_words], ['eu'])
+
+        # Import again does not duplicate words
+        import_delaf(self.path, self.db)
+        self.assertEqual(len(self.db), 5, 'Test count of saved words')
+
+    def test_import_eviction(self):
+        """Test that oldest words are removed once, at end of import."""
+        with mock.patch.multiple(settings, LOCAL_DICT_MAX_SIZE=1,
+                                 LOCAL_DICT_MIN_COUNT=0):
+            stats = import_delaf(self.path, self.db, batch_size=2)
+
+        evictions = self.db.metrics.snapshot()['latencies']['eviction']
+        self.assertEqual(evictions['count'], 1, 'Test count of cleanings')
+        self.assertTrue(stats['evicted'] > 0, 'Test removed words')
+        self.assertEqual(stats['kept'], len(self.db), 'Test kept words')
+        self.assertEqual(stats['kept'] + stats['evicted'], 5)
@@ -0,0 +1,87 @@
+import unittest
+import os
+
+from dictionary import LocalDictionary
+from dictionary.lexicon import Lexicon, compile_lexicon
+import settings
+
+
+class LexiconTest(unittest.TestCase):
+    """Test case used for test function of module 'lexicon'."""
+
+    def setUp(self):
+        """Initialization of test and compile a lexicon."""
+        self.path = os.path.join(
+            settings.PROJECT_PATH,
+            settings.DATABASE_PATH,
+            'lexicon-test.lex'
+        )
+        words = list()
+        for label, lem, type in [
+            ('être', 'être', 'verbe'),
+            ('suis', 'être', 'verbe'),
+            ('été', 'été', 'nom'),
+            ('été', 'être', 'verbe'),
+            ('avoir', 'avoir', 'verbe')
+        ]:
+            word = dict(LocalDictionary.DEFAULT_MODEL)
+            word.update({'label': label, 'lem': lem, 'type': type})
+            words.append(word)
+        self.count = compile_lexicon(words, self.path)
+
+    def tearDown(self):
+        """Cleaning of resources created for tests."""
+        os.remove(self.path)
+
+    def test_find(self):
+        """Test to find words by label and lem in a lexicon."""
+        lexicon = Lexicon(self.path)
+
+        self.assertEqual(len(lexicon), self.count, 'Test count of words')
+        self.assertEqual(
+            sorted(w['lem'] for w in lexicon.find('label', 'été')),
+            sorted(['être', 'été'])
+        )
+        self.assertEqual(
+            sorted(w['label'] for w in lexicon.find('lem', 'être')),
+            sorted(['suis', 'être', 'été'])
+        )
+        self.assertEqual(lexicon.find('label', 'absent'), [])
+        self.assertEqual(
+            sorted(w['lem'] for w in lexicon.find('label', 'ETE', True)),
+            sorted(['être', 'été']),
+            'Test to find without accents and case'
+        )
+        self.assertEqual(lexicon.find('label', 'ETE'), [])
+        lexicon.close()
+
+    def test_local_dictionary_lexicon(self):
+        """Test if a local dictionary search in its lexicon."""
+        db = LocalDictionary('lexicon-test', lexicon=self.path)
+        word = dict(db.DEFAULT_MODEL)
+        word.update({'label': 'suis', 'lem': 'être', 'type': 'verbe'})
+        db.insert(word)
+
+        search_word = dict(db.DEFAULT_MODEL)
+        search_word.update({'lem': 'être', 'type': 'verbe'})
+        find_words = db.find(search_word)
+        search_word.update({'lem': 'Etre'})
+        normalized_words = db.find(search_word, accent_insensitive=True)
+        path = db.get_table_path()
+        db.close()
+        os.remove(path)
+
+        self.assertEqual(
+            sorted(w['label'] for w in find_words),
+            sorted(['suis', 'être', 'été']),
+            'Test if words are found once'
+        )
+        self.assertEqual(
+            [w['isPersistent'] for w in find_words].count(True), 1,
+            'Test if only inserted word is persistent'
+        )
+        self.assertEqual(
+            sorted(w['label'] for w in normalized_words),
+            sorted(['suis', 'être', 'été']),
+            'Test to find in lexicon without accents and case'
+        )
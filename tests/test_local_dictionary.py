@@ -1,7 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
+import gc
+import sys
+from unittest import mock
 import unittest
 import os.path
 
 from dictionary import LocalDictionary
+from dictionary.indexes import SymSpell
 import settings
 
 
@@ -11,11 +16,14 @@ class LocalDictionaryTest(unittest.TestCase):
 
     """
 
+    engine = 'json'
+
     def setUp(self):
         """Initialization of test and insert a word."""
         self.database_name = 'local-dictionary-test'
         self.db = LocalDictionary(
-            dictionary_name=self.database_name
+            dictionary_name=self.database_name,
+            engine=self.engine
         )
 
         self.inserted_word_label = 'my test'
@@ -134,3 +142,294 @@ class LocalDictionaryTest(unittest.TestCase):
         find_words = self.db.find(search_word)
 
         self.assertTrue(find_words == [], 'Test if find a removed word')
+
+    def test_find_word_by_type_and_lem(self):
+        """Test to find elements with indexed keys 'type' and 'lem'."""
+        word = dict(self.db.DEFAULT_MODEL)
+        word.update({'label': 'tests', 'type': 'nom', 'lem': 'test'})
+        self.db.insert(word)
+
+        search_word = dict(self.db.DEFAULT_MODEL)
+        search_word.update({'label': 'tests', 'type': 'verbe'})
+        self.assertTrue(
+            self.db.find(search_word) == [],
+            'Test if type is taken into account'
+        )
+
+        search_word = dict(self.db.DEFAULT_MODEL)
+        search_word['lem'] = 'test'
+        find_words = self.db.find(search_word)
+        self.assertTrue(
+            len(find_words) == 1 and find_words[0]['_id'] == word['_id'],
+            'Test to find word by its lem'
+        )
+
+    def test_update_indexed_key(self):
+        """Test if an updated label is found with its new value."""
+        self.db.update({'label': 'my new test'}, self.word)
+
+        search_word = dict(self.db.DEFAULT_MODEL)
+        search_word['label'] = self.inserted_word_label
+        self.assertTrue(
+            self.db.find(search_word) == [],
+            'Test if old label is not found anymore'
+        )
+
+        search_word['label'] = 'my new test'
+        find_words = self.db.find(search_word)
+        self.assertTrue(find_words[0]['_id'] == self.word['_id'])
+
+    def test_clock_flushing(self):
+        """Test if clocks touched by 'find' are saved only on flush."""
+        search_word = dict(self.db.DEFAULT_MODEL)
+        search_word['label'] = self.inserted_word_label
+        modified_time = os.path.getmtime(self.db.get_table_path())
+        self.db.find(search_word)
+
+        self.assertTrue(
+            os.path.getmtime(self.db.get_table_path()) == modified_time,
+            'Test if find does not write database'
+        )
+
+        clock = self.db._words[self.db._ids[self.word['_id']]]['clock']
+        self.db.close()
+        self.db = LocalDictionary(
+            dictionary_name=self.database_name,
+            engine=self.engine
+        )
+
+        saved_word = self.db.all()[0]
+        self.assertTrue(saved_word['clock'] == clock, 'Test if clock is saved')
+
+    def test_bulk_cleaning(self):
+        """Test if cleaning remove oldest words in one write."""
+        min_count = settings.LOCAL_DICT_MIN_COUNT
+        settings.LOCAL_DICT_MIN_COUNT = 0
+        for i in range(60):
+            word = dict(self.db.DEFAULT_MODEL)
+            word['label'] = 'word {}'.format(i)
+            word['sens'] = [{'definition': 'word ' * 200}]
+            self.db.insert(word)
+        # Touch the oldest word
+        self.db.find(self.word)
+
+        removals = list()
+        remove = self.db._db.remove
+        self.db._db.remove = lambda **kw: removals.append(kw) or remove(**kw)
+        size = self.db._db.get_size()
+        self.db._clean_oldest()
+        settings.LOCAL_DICT_MIN_COUNT = min_count
+
+        self.assertEqual(len(removals), 1, 'Test count of writes')
+        self.assertTrue(
+            self.db._db.get_size() <= size * settings.LOCAL_DICT_CLEAN_COEF,
+            'Test if size is reduced'
+        )
+        self.assertTrue(
+            self.db.find(self.word) != [],
+            'Test if last touched word is kept'
+        )
+
+    def test_insert_and_upsert_many(self):
+        """Test to insert and upsert several words in one write."""
+        words = list()
+        for label in ['salut', 'bonjour', 'bonjour']:
+            word = dict(self.db.DEFAULT_MODEL)
+            word['label'] = label
+            words.append(word)
+        self.db.insert_many(words)
+
+        self.assertEqual(len(self.db), 4, 'Test count of words')
+        self.assertTrue(all([w['isPersistent'] for w in words]))
+
+        word = dict(self.db.DEFAULT_MODEL)
+        word.update({'label': 'salut', 'sens': ['hello']})
+        new_word = dict(self.db.DEFAULT_MODEL)
+        new_word['label'] = 'coucou'
+        self.db.upsert_many([word, new_word])
+
+        self.assertEqual(len(self.db), 5, 'Test if only new word is added')
+        self.assertTrue(word['_id'] == words[0]['_id'], 'Test upserted word')
+
+        search_word = dict(self.db.DEFAULT_MODEL)
+        search_word['label'] = 'salut'
+        find_words = self.db.find(search_word)
+        self.assertTrue(find_words[0]['sens'] == ['hello'])
+
+    def test_find_by_codes(self):
+        """Test to find words by their flexional and semantic codes."""
+        variants = {
+            'petit': [['masculin', 'singulier']],
+            'petite': [['féminin', 'singulier']],
+            'petites': [['féminin', 'pluriel']]
+        }
+        for label, flexional in variants.items():
+            word = dict(self.db.DEFAULT_MODEL)
+            word.update({
+                'label': label,
+                'lem': 'petit',
+                'flexional': flexional,
+                'semantic': ['langage courant']
+            })
+            self.db.insert(word)
+
+        search_word = dict(self.db.DEFAULT_MODEL)
+        search_word.update({
+            'lem': 'petit',
+            'flexional': ['féminin', 'pluriel'],
+            'semantic': ['z1']
+        })
+        find_words = self.db.find(search_word)
+
+        self.assertEqual(
+            [w['label'] for w in find_words], ['petites'],
+            'Test if only matching variant is found'
+        )
+
+    def test_complete(self):
+        """Test completion of a prefix with saved labels."""
+        words = list()
+        for label, type in [('mot', 'nom'), ('mots', 'nom'),
+                            ('motte', 'nom'), ('moteur', 'adjectif'),
+                            ('mur', 'nom')]:
+            word = dict(self.db.DEFAULT_MODEL)
+            word.update({'label': label, 'type': type})
+            words.append(word)
+        self.db.insert_many(words)
+        self.db.remove(words[2])
+
+        self.assertEqual(
+            self.db.complete('mo'),
+            ['mot', 'mots', 'moteur'],
+            'Test order of labels'
+        )
+        self.assertEqual(self.db.complete('mo', limit=1), ['mot'])
+        self.assertEqual(
+            self.db.complete('mo', type='adjectif'),
+            ['moteur'],
+            'Test labels of type'
+        )
+        self.assertEqual(self.db.complete('x'), [])
+
+    def test_suggest(self):
+        """Test suggestion of saved labels near a misspelled one."""
+        words = list()
+        for label in ['dictionnaire', 'dictionnaires', 'direction']:
+            word = dict(self.db.DEFAULT_MODEL)
+            word['label'] = label
+            words.append(word)
+        self.db.insert_many(words)
+
+        self.assertEqual(
+            self.db.suggest('dictionaire'),
+            [('dictionnaire', 1), ('dictionnaires', 2)],
+            'Test nearest labels first'
+        )
+        self.db.remove(words[0])
+        self.assertEqual(
+            self.db.suggest('dictionaire', max_distance=1), [],
+            'Test if removed label is not suggested'
+        )
+
+    def test_empty_label(self):
+        """Test that a word without label can be saved and opened."""
+        word = dict(self.db.DEFAULT_MODEL)
+        word['label'] = ''
+        self.db.insert(word)
+        self.db.close()
+        self.db = LocalDictionary(
+            dictionary_name=self.database_name,
+            engine=self.engine
+        )
+
+        self.assertEqual(len(self.db), 2, 'Test if words are opened')
+        self.assertEqual(self.db.complete(''), [self.inserted_word_label])
+        empty = [w for w in self.db.all() if not w['label']][0]
+        self.db.remove(empty)
+        self.assertEqual(len(self.db), 1, 'Test if word is removed')
+
+    def test_suggest_while_building(self):
+        """Test that labels saved while suggestions are built are kept."""
+        # Wait the index built when opening, then build it again
+        self.db._build_symspell()
+        self.db._symspell = None
+        word = dict(self.db.DEFAULT_MODEL)
+        word['label'] = 'dictionnaire'
+        add = SymSpell.add
+
+        def add_and_insert(symspell, label):
+            if not word['isPersistent']:
+                # Database is not locked during the build
+                self.db.insert(word)
+            add(symspell, label)
+
+        with mock.patch.object(SymSpell, 'add', add_and_insert):
+            self.db._build_symspell()
+
+        self.assertEqual(
+            self.db.suggest('dictionaire'),
+            [('dictionnaire', 1)],
+            'Test if inserted label is suggested'
+        )
+
+    def test_lazy_opening(self):
+        """Test that database is only opened on first use."""
+        db = LocalDictionary(
+            dictionary_name='lazy-test',
+            engine=self.engine
+        )
+        path = db.get_table_path()
+        self.assertFalse(os.path.exists(path), 'Test if database is closed')
+
+        self.assertEqual(len(db), 0)
+        self.assertTrue(os.path.exists(path), 'Test if database is opened')
+        db.close()
+        os.remove(path)
+
+    def test_shared_between_threads(self):
+        """Test to insert and find words from several threads."""
+        flush_count = settings.LOCAL_DICT_CLOCK_FLUSH_COUNT
+        settings.LOCAL_DICT_CLOCK_FLUSH_COUNT = 5
+
+        def work(thread):
+            found = 0
+            for i in range(20):
+                word = dict(self.db.DEFAULT_MODEL)
+                word['label'] = 'word {}'.format(i)
+                word['type'] = 'type {}'.format(thread)
+                self.db.insert(word)
+                found += len(self.db.find(dict(word, isPersistent=False)))
+            return found
+
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                counts = list(executor.map(work, range(8)))
+        finally:
+            settings.LOCAL_DICT_CLOCK_FLUSH_COUNT = flush_count
+
+        self.assertEqual(counts, [20] * 8, 'Test words found by threads')
+        self.assertEqual(len(self.db), 1 + 20 * 8)
+        self.assertEqual(len(self.db._db), 1 + 20 * 8, 'Test saved words')
+
+    def test_invalid_arguments(self):
+        """Test that a dictionary which cannot be created is deleted
+        without error.
+        """
+        errors = list()
+        hook, sys.unraisablehook = sys.unraisablehook, errors.append
+        try:
+            with self.assertRaises(KeyError):
+                LocalDictionary('invalid-test', engine='unknown')
+            with self.assertRaises(OSError):
+                LocalDictionary('invalid-test', lexicon='missing.lex')
+            gc.collect()
+        finally:
+            sys.unraisablehook = hook
+
+        self.assertEqual(errors, [], 'Test errors of __del__')
+
+
+class SQLiteLocalDictionaryTest(LocalDictionaryTest):
+    """Same test case with the SQLite storage engine."""
+
+    engine = 'sqlite'
@@ -0,0 +1,57 @@
+import threading
+import time
+import unittest
+
+from dictionary.locks import RWLock
+
+
+class RWLockTest(unittest.TestCase):
+    """Test case used for test the readers-writer lock."""
+
+    def setUp(self):
+        self.lock = RWLock()
+
+    def test_readers_together(self):
+        """Test that several threads can read at the same time."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def read():
+            with self.lock.read():
+                # Fails if readers cannot hold the lock together
+                barrier.wait()
+
+        threads = [threading.Thread(target=read) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertFalse(barrier.broken, 'Test if readers read together')
+
+    def test_writer_alone(self):
+        """Test that a writer waits readers and is alone."""
+        events = list()
+
+        def write():
+            with self.lock.write():
+                events.append('write')
+
+        with self.lock.read():
+            thread = threading.Thread(target=write)
+            thread.start()
+            time.sleep(0.05)
+            events.append('read')
+        thread.join()
+
+        self.assertEqual(events, ['read', 'write'])
+
+    def test_writer_reentrant(self):
+        """Test that the writer can acquire the lock again."""
+        with self.lock.write():
+            with self.lock.write():
+                with self.lock.read():
+                    pass
+
+        with self.lock.write():
+            # Lock is released
+            pass
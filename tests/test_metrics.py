@@ -0,0 +1,47 @@
+import unittest
+
+from dictionary.metrics import Histogram, Metrics
+
+
+class MetricsTest(unittest.TestCase):
+    """Test case used for test counters and latency histograms."""
+
+    def test_percentiles(self):
+        """Test percentiles of a histogram."""
+        histogram = Histogram()
+        for i in range(1, 101):
+            # From 1 ms to 100 ms
+            histogram.record(i / 1000)
+
+        summary = histogram.get_summary()
+        self.assertEqual(summary['count'], 100)
+        self.assertAlmostEqual(summary['mean'], 0.0505)
+        self.assertAlmostEqual(summary['p50'], 0.05, delta=0.05 / 64)
+        self.assertAlmostEqual(summary['p95'], 0.095, delta=0.095 / 64)
+        self.assertAlmostEqual(summary['p99'], 0.099, delta=0.099 / 64)
+        self.assertEqual(summary['max'], 0.1)
+
+    def test_empty_histogram(self):
+        """Test summary of a histogram without latency."""
+        summary = Histogram().get_summary()
+
+        self.assertEqual(summary['count'], 0)
+        self.assertIsNone(summary['p99'])
+        self.assertIsNone(summary['max'])
+
+    def test_snapshot(self):
+        """Test snapshot and reset of metrics."""
+        metrics = Metrics()
+        metrics.incr('hits')
+        metrics.incr('hits', 2)
+        with metrics.time('find'):
+            pass
+
+        snapshot = metrics.snapshot(reset=True)
+        self.assertEqual(snapshot['counters'], {'hits': 3})
+        self.assertEqual(snapshot['latencies']['find']['count'], 1)
+        self.assertEqual(
+            metrics.snapshot(),
+            {'counters': {}, 'latencies': {}},
+            'Test reset'
+        )
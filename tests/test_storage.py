@@ -0,0 +1,104 @@
+import unittest
+import os
+
+from tinydb import Query
+
+from dictionary.storage import open_table
+
+
+class StorageTest(unittest.TestCase):
+    """Test case used for test storage engines of module 'storage'."""
+
+    engine = 'json'
+
+    def setUp(self):
+        """Initialization of test and insert documents."""
+        self.table_name = 'storage-test'
+        self.table = open_table(self.table_name, self.engine)
+        self.doc_ids = self.table.insert_multiple([
+            {'label': 'bonjour', 'type': 'nom', 'clock': 1},
+            {'label': 'salut', 'type': 'nom', 'clock': 2}
+        ])
+
+    def tearDown(self):
+        """Cleaning of resources created for tests."""
+        path = self.table.get_table_path()
+        self.table.close()
+        del self.table
+        os.remove(path)
+
+    def test_insert_and_all(self):
+        """Test to insert documents and get them back."""
+        doc_id = self.table.insert({'label': 'test'})
+
+        docs = self.table.all()
+        self.assertEqual(len(self.table), 3, 'Test count of documents')
+        self.assertTrue(docs[-1].doc_id == doc_id, 'Test id of document')
+        self.assertTrue(docs[-1]['label'] == 'test')
+
+    def test_search_and_update(self):
+        """Test to search and update documents."""
+        Word = Query()
+        self.table.update({'type': 'verbe'}, Word.label == 'salut')
+
+        docs = self.table.search(Word.type == 'verbe')
+        self.assertTrue(len(docs) == 1 and docs[0]['label'] == 'salut')
+
+    def test_search_columns(self):
+        """Test to search with indexed and not indexed fields."""
+        Word = Query()
+        self.table.insert({'label': 'salut', 'type': 'interjection'})
+
+        docs = self.table.search((Word.label == 'salut') & (Word.clock == 2))
+        self.assertTrue(len(docs) == 1 and docs[0]['type'] == 'nom')
+        docs = self.table.search(Word.label.one_of(['bonjour', 'salut']))
+        self.assertEqual(len(docs), 3, 'Test query without equality')
+
+    def test_update_many(self):
+        """Test to update documents with their own fields."""
+        self.table.update_many({
+            self.doc_ids[0]: {'clock': 3},
+            self.doc_ids[1]: {'clock': 4}
+        })
+
+        clocks = [doc['clock'] for doc in self.table.all()]
+        self.assertEqual(clocks, [3, 4], 'Test if each clock is updated')
+
+    def test_upsert_and_remove(self):
+        """Test to upsert then remove documents."""
+        Word = Query()
+        self.table.upsert({'label': 'test'}, Word.label == 'test')
+        self.table.upsert({'type': 'adjectif'}, Word.label == 'test')
+        self.assertEqual(len(self.table), 3, 'Test if upsert insert once')
+
+        self.table.remove(doc_ids=self.doc_ids)
+        docs = self.table.all()
+        self.assertTrue(len(docs) == 1 and docs[0]['type'] == 'adjectif')
+
+        self.table.truncate()
+        self.assertEqual(len(self.table), 0, 'Test if table is empty')
+
+    def test_reopen(self):
+        """Test if documents are saved when table is reopened."""
+        self.table.close()
+        self.table = open_table(self.table_name, self.engine)
+
+        self.assertEqual(len(self.table), 2, 'Test count of documents')
+
+
+class SQLiteStorageTest(StorageTest):
+    """Same test case with the SQLite storage engine."""
+
+    engine = 'sqlite'
+
+    def test_where(self):
+        """Test that rows are selected with indexed columns."""
+        Word = Query()
+        where, params = self.table._where(
+            ((Word.label == 'salut') & (Word.clock == 2))._hash
+        )
+
+        self.assertEqual(where, ' WHERE label = ?')
+        self.assertEqual(params, ('salut', ))
+        where, params = self.table._where(Word.clock.exists()._hash)
+        self.assertEqual((where, params), ('', ()), 'Test not indexed')
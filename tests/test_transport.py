@@ -0,0 +1,193 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+import unittest
+
+from dictionary import transport
+import settings
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answer the requested path and query, count connections."""
+
+    protocol_version = 'HTTP/1.1'
+    clients = set()  # Address of each connection
+    requests = 0
+
+    def do_GET(self):
+        if self.path == '/ping':
+            # Pinging thread of Dictionary must not find this API
+            self.send_error(404)
+            return
+        _Handler.clients.add(self.client_address)
+        _Handler.requests += 1
+        if self.path.startswith('/slow'):
+            time.sleep(0.2)
+        if self.path.startswith('/error'):
+            self.send_error(503)
+            return
+        if self.path.startswith('/busy'):
+            self.send_response(503)
+            self.send_header('Retry-After', '3')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = json.dumps({'path': self.path}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TransportTest(unittest.TestCase):
+    """Test case used for test functions of module 'transport'."""
+
+    def setUp(self):
+        """Start a local API."""
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True) \
+            .start()
+        self.api_url = settings.DICTIONARY_API_URL
+        settings.DICTIONARY_API_URL = 'http://127.0.0.1:{}'.format(
+            self.server.server_address[1]
+        )
+        transport.close_session()
+        transport.reset_breakers()
+        _Handler.clients = set()
+        _Handler.requests = 0
+
+    def tearDown(self):
+        """Stop the local API."""
+        transport.close_session()
+        transport.reset_breakers()
+        settings.DICTIONARY_API_URL = self.api_url
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_build_url(self):
+        """Test the encoding of path and query."""
+        url = transport.build_url(
+            'unitex', 'compose',
+            lem=' être ',
+            flexional=['P', '3s'],
+            gram=None
+        )
+
+        self.assertEqual(
+            url,
+            '{}/unitex/compose?lem=%C3%AAtre&flexional=P&flexional=3s'.format(
+                settings.DICTIONARY_API_URL
+            )
+        )
+
+    def test_keep_alive(self):
+        """Test that requests share one connection."""
+        for label in ('chat', 'chien', 'cheval'):
+            result = transport.get('unitex', label)
+            self.assertEqual(result['path'], '/unitex/{}'.format(label))
+
+        self.assertEqual(len(_Handler.clients), 1, 'Test count of connections')
+
+    def test_submit(self):
+        """Test that requests run concurrently in the pool of threads."""
+        futures = [
+            transport.submit('unitex', label)
+            for label in ('chat', 'chien', 'cheval')
+        ]
+
+        self.assertEqual(
+            [future.result(timeout=5)['path'] for future in futures],
+            ['/unitex/chat', '/unitex/chien', '/unitex/cheval']
+        )
+
+    def test_single_flight(self):
+        """Test that identical running requests share one call."""
+        futures = [
+            transport.submit('slow', lem='être', gram='verbe'),
+            transport.submit('slow', gram='verbe', lem=' être'),
+            transport.submit('slow', lem='être', gram='verbe')
+        ]
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(_Handler.requests, 1, 'Test count of requests')
+        self.assertEqual(results[0], results[1])
+        self.assertIsNot(results[0], results[1], 'Test copy of result')
+
+    def test_unreachable(self):
+        """Test that an unreachable API is not requested again."""
+        # Port of a closed socket
+        closed = socket.socket()
+        closed.bind(('127.0.0.1', 0))
+        settings.DICTIONARY_API_URL = 'http://127.0.0.1:{}'.format(
+            closed.getsockname()[1]
+        )
+        closed.close()
+
+        start_time = time.time()
+        with self.assertRaises(OSError):
+            transport.get('ping', _timeout=1)
+        # Retries would wait their backoff
+        self.assertLess(time.time() - start_time, 0.1)
+
+    def test_retry_after(self):
+        """Test that retries do not wait the delay asked by the API."""
+        start_time = time.time()
+        with self.assertRaises(OSError):
+            transport.get('busy', 'chat')
+
+        retries = settings.DICTIONARY_API_RETRIES
+        self.assertEqual(_Handler.requests, retries + 1, 'Test retries')
+        self.assertLess(time.time() - start_time, 1)
+
+    def test_circuit_breaker(self):
+        """Test that a failing endpoint is not requested anymore."""
+        retries = settings.DICTIONARY_API_RETRIES
+        settings.DICTIONARY_API_RETRIES = 0
+        try:
+            for i in range(settings.DICTIONARY_API_BREAKER_MIN_CALLS):
+                with self.assertRaises(OSError):
+                    transport.get('error', 'chat')
+            requests = _Handler.requests
+
+            with self.assertRaises(transport.CircuitOpenError):
+                transport.get('error', 'chien')
+            self.assertEqual(_Handler.requests, requests, 'Test fail fast')
+            # Other endpoints are still requested
+            self.assertIsNotNone(transport.get('unitex', 'chat'))
+        finally:
+            settings.DICTIONARY_API_RETRIES = retries
+
+    def test_slower_server(self):
+        """Test that requests still succeed when the server gets slower
+        than the latencies seen before.
+        """
+        breaker = transport.get_breaker('slow')
+        for i in range(settings.DICTIONARY_API_BREAKER_MIN_CALLS):
+            breaker.record(True, 0.01)
+
+        with self.assertRaises(OSError):
+            transport.get('slow', 'chat')
+        for label in ('chien', 'cheval'):
+            result = transport.get('slow', label)
+            self.assertEqual(result['path'], '/slow/{}'.format(label))
+        self.assertEqual(breaker.get_state(), 'closed')
+
+    def test_lazy_import(self):
+        """Test that requests is not imported with the package."""
+        code = 'import sys, dictionary; print("requests" in sys.modules)'
+        output = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=settings.PROJECT_PATH,
+            capture_output=True,
+            text=True
+        ).stdout
+
+        self.assertEqual(output.strip(), 'False')